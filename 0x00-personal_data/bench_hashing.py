@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Benchmark of password verifications per second by HashingService pool size.
+"""
+from concurrent.futures import wait
+import sys
+import time
+
+from encrypt_password import (HashingService, generate_hashed_password,
+                              verify_password)
+
+
+def main():
+    """
+    Prints verifications/sec for pool sizes 1, 2, 4, ... up to the given
+    maximum.
+    """
+    verifications = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    password = "MyAmazingPassw0rd"
+    hashed_password = generate_hashed_password(password)
+
+    workers = 1
+    while workers <= max_workers:
+        service = HashingService(max_workers=workers,
+                                 max_pending=verifications)
+        started = time.perf_counter()
+        futures = [service.submit(verify_password, hashed_password, password)
+                   for _ in range(verifications)]
+        wait(futures)
+        elapsed = time.perf_counter() - started
+        service.shutdown()
+        assert all(future.result() for future in futures)
+        print(f"{workers:>3} workers: "
+              f"{verifications / elapsed:>8.1f} verifications/sec")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the single-pass Redactor against the previous
+one-re.sub-per-field obfuscation, in lines per second.
+"""
+import re
+import sys
+import timeit
+from typing import List
+
+from filtered_logger import PII_FIELDS, Redactor, obfuscate_message
+
+SAMPLE_LINE = ("name=Bob Smith; email=bob@dylan.com; phone=(555) 555-0100; "
+               "ssn=000-12-3456; password=bcrypt_hash; ip=60ed:c396:2ff:244; "
+               "last_login=2019-11-14 06:16:24; user_agent=Mozilla/5.0;")
+WIDE_FIELDS = PII_FIELDS + tuple(f"secret_{i}" for i in range(15))
+WIDE_LINE = SAMPLE_LINE + "".join(f" secret_{i}=value;" for i in range(15))
+
+
+def per_field_obfuscate(fields_to_redact: List[str], redaction_text: str,
+                        log_message: str, field_separator: str) -> str:
+    """
+    The previous implementation: one re.sub per field.
+    """
+    for field in fields_to_redact:
+        log_message = re.sub(field + r'=.*?' + field_separator,
+                             field + '=' + redaction_text + field_separator,
+                             log_message)
+    return log_message
+
+
+def main():
+    """
+    Prints lines/sec for each implementation.
+    """
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for fields, line in ((PII_FIELDS, SAMPLE_LINE), (WIDE_FIELDS, WIDE_LINE)):
+        redactor = Redactor(fields, "***", ";")
+        assert redactor.redact(line) == \
+            per_field_obfuscate(fields, "***", line, ";")
+
+        print(f"{len(fields)} fields:")
+        candidates = {
+            "per-field re.sub":
+                lambda: per_field_obfuscate(fields, "***", line, ";"),
+            "obfuscate_message":
+                lambda: obfuscate_message(fields, "***", line, ";"),
+            "Redactor.redact": lambda: redactor.redact(line),
+        }
+        for name, func in candidates.items():
+            seconds = min(timeit.repeat(func, number=number, repeat=3))
+            print(f"  {name:<20} {number / seconds:>12,.0f} lines/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,32 +2,170 @@
 """
 Provides functions to hash passwords and verify their validity
 """
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import os
+import threading
+import time
 import bcrypt
 from bcrypt import hashpw
 
-def generate_hashed_password(plain_text_password: str) -> bytes:
+
+def generate_hashed_password(plain_text_password: str,
+                             rounds: int = None) -> bytes:
     """
     Generates a hashed version of a given password.
-    
+
     Args:
         plain_text_password (str): The password to be hashed.
-    
+        rounds (int): bcrypt cost factor, bcrypt's default if None.
+
     Returns:
         bytes: The hashed password in bytes.
     """
-    encoded_password = plain_text_password.encode()  # Convert the password to bytes
-    hashed_password = hashpw(encoded_password, bcrypt.gensalt())  # Hash the password with a salt
+    # Convert the password to bytes
+    encoded_password = plain_text_password.encode()
+    salt = bcrypt.gensalt() if rounds is None else bcrypt.gensalt(rounds)
+    # Hash the password with a salt
+    hashed_password = hashpw(encoded_password, salt)
     return hashed_password
 
+
+def hash_cost(hashed_password: bytes) -> int:
+    """
+    Reads the cost factor of a bcrypt hash.
+
+    Args:
+        hashed_password (bytes): A hash such as b"$2b$12$...".
+
+    Returns:
+        int: The cost factor the hash was generated with.
+    """
+    return int(hashed_password.split(b"$")[2])
+
+
+def calibrate_cost(target_seconds: float = 0.25, min_rounds: int = 4,
+                   max_rounds: int = 16) -> int:
+    """
+    Picks the highest cost factor whose hash time on this machine stays
+    within target_seconds. Each extra round doubles the hash time, so the
+    calibration itself takes about twice the target.
+
+    Args:
+        target_seconds (float): Acceptable time to hash one password.
+        min_rounds (int): Lowest cost factor returned.
+        max_rounds (int): Highest cost factor returned.
+
+    Returns:
+        int: The calibrated cost factor.
+    """
+    def measure(rounds: int) -> float:
+        salt = bcrypt.gensalt(rounds)
+        started = time.perf_counter()
+        hashpw(b"calibration password", salt)
+        return time.perf_counter() - started
+
+    rounds = min_rounds
+    elapsed = measure(rounds)
+    while rounds < max_rounds and elapsed * 2 <= target_seconds:
+        rounds += 1
+        elapsed = measure(rounds)
+    if elapsed > target_seconds and rounds > min_rounds:
+        rounds -= 1
+    return rounds
+
+
 def verify_password(hashed_password: bytes, plain_text_password: str) -> bool:
     """
     Validates a plain text password against a hashed password.
-    
+
     Args:
         hashed_password (bytes): The hashed password to verify against.
         plain_text_password (str): The plain text password to check.
-    
+
     Returns:
         bool: True if the password is valid, False otherwise.
     """
-    return bcrypt.checkpw(plain_text_password.encode(), hashed_password)  # Compare hashed and plain text passwords
+    # Compare hashed and plain text passwords
+    return bcrypt.checkpw(plain_text_password.encode(), hashed_password)
+
+
+class HashingBusyError(RuntimeError):
+    """
+    Raised when a HashingService already has max_pending hashes queued or
+    running.
+    """
+
+
+class HashingService:
+    """
+    Runs bcrypt on a bounded thread pool instead of the calling thread.
+    bcrypt releases the GIL while hashing, so the workers hash in parallel.
+    At most max_pending hashes are queued or running; further calls fail
+    fast with HashingBusyError so callers can shed load instead of queueing.
+    """
+
+    def __init__(self, max_workers: int = None, max_pending: int = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="bcrypt")
+        self._pending = threading.BoundedSemaphore(self.max_pending)
+
+    def submit(self, function, *args) -> Future:
+        """
+        Schedules function(*args) on the pool.
+
+        Returns:
+            Future: The future result of the call.
+
+        Raises:
+            HashingBusyError: If max_pending calls are already in flight.
+        """
+        if not self._pending.acquire(blocking=False):
+            raise HashingBusyError(
+                f"{self.max_pending} password hashes already pending")
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    def generate_hashed_password(self, plain_text_password: str) -> bytes:
+        """
+        Hashes a password on the pool and waits for the result.
+        """
+        return self.submit(generate_hashed_password,
+                           plain_text_password).result()
+
+    def verify_password(self, hashed_password: bytes,
+                        plain_text_password: str) -> bool:
+        """
+        Validates a password on the pool and waits for the result.
+        """
+        return self.submit(verify_password, hashed_password,
+                           plain_text_password).result()
+
+    async def generate_hashed_password_async(
+            self, plain_text_password: str) -> bytes:
+        """
+        Hashes a password on the pool without blocking the event loop.
+        """
+        return await asyncio.wrap_future(
+            self.submit(generate_hashed_password, plain_text_password))
+
+    async def verify_password_async(self, hashed_password: bytes,
+                                    plain_text_password: str) -> bool:
+        """
+        Validates a password on the pool without blocking the event loop.
+        """
+        return await asyncio.wrap_future(
+            self.submit(verify_password, hashed_password, plain_text_password))
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops the workers once the pending hashes are done.
+        """
+        self._executor.shutdown(wait=wait)
@@ -1,65 +1,249 @@
 #!/usr/bin/env python3
 """
-Provides functions to filter sensitive data and create a logging mechanism with redaction capabilities.
+Provides functions to filter sensitive data and create a logging mechanism
+with redaction capabilities.
 """
-from typing import List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, List, Tuple
+import argparse
 import re
 import logging
 import os
+import queue
+import resource
+import shutil
+import sys
+import threading
+import time
 import mysql.connector
 
-PII_FIELDS = ('name', 'email', 'phone', 'ssn', 'password')  # Fields to be obfuscated
+# Fields to be obfuscated
+PII_FIELDS = ('name', 'email', 'phone', 'ssn', 'password')
+
+
+class Redactor:
+    """
+    Redacts a fixed set of fields in a single regex pass.
+    The pattern is compiled once, so a Redactor should be built once
+    and reused for every message.
+    """
+
+    def __init__(self, fields_to_redact: List[str], redaction_text: str,
+                 field_separator: str):
+        separator = re.escape(field_separator)
+        alternation = '|'.join(re.escape(field) for field in fields_to_redact)
+        if len(field_separator) == 1:
+            # same match as '.*?' + separator, without backtracking
+            value = '[^' + separator + '\\n]*'
+        else:
+            value = '.*?'
+        self.pattern = re.compile('(' + alternation + ')=' + value + separator)
+        self.replacement = (r'\1=' + redaction_text.replace('\\', r'\\') +
+                            field_separator.replace('\\', r'\\'))
+        self.has_fields = len(fields_to_redact) > 0
+
+    def redact(self, log_message: str) -> str:
+        """
+        Obfuscates the fields of this redactor in a log message.
+
+        Args:
+            log_message (str): The log message containing fields.
+
+        Returns:
+            str: The obfuscated log message.
+        """
+        if not self.has_fields:
+            return log_message
+        return self.pattern.sub(self.replacement, log_message)
+
+
+@lru_cache(maxsize=32)
+def get_redactor(fields_to_redact: Tuple[str, ...], redaction_text: str,
+                 field_separator: str) -> Redactor:
+    """
+    Returns a shared Redactor for a field set and separator.
+    """
+    return Redactor(fields_to_redact, redaction_text, field_separator)
+
 
 def obfuscate_message(fields_to_redact: List[str], redaction_text: str,
                       log_message: str, field_separator: str) -> str:
     """
     Obfuscates specified fields in a log message.
-    
+
     Args:
         fields_to_redact (list): List of field names to obfuscate.
         redaction_text (str): Text to replace sensitive fields with.
         log_message (str): The log message containing fields.
-        field_separator (str): The character separating fields in the message.
-    
+        field_separator (str): The character separating fields in the
+            message.
+
     Returns:
         str: The obfuscated log message.
     """
-    for field in fields_to_redact:
-        log_message = re.sub(field + r'=.*?' + field_separator,
-                             field + '=' + redaction_text + field_separator, log_message)
-    return log_message
+    redactor = get_redactor(tuple(fields_to_redact), redaction_text,
+                            field_separator)
+    return redactor.redact(log_message)
+
 
 class SensitiveDataFormatter(logging.Formatter):
     """
     A logging Formatter that redacts sensitive fields from log messages.
     """
     REDACTION_TEXT = "***"
-    LOG_FORMAT = "[APPLICATION] %(name)s %(levelname)s %(asctime)-15s: %(message)s"
+    LOG_FORMAT = ("[APPLICATION] %(name)s %(levelname)s %(asctime)-15s: "
+                  "%(message)s")
     FIELD_SEPARATOR = ";"
 
     def __init__(self, fields_to_redact: List[str]):
         super(SensitiveDataFormatter, self).__init__(self.LOG_FORMAT)
         self.fields_to_redact = fields_to_redact
+        self.redactor = Redactor(fields_to_redact, self.REDACTION_TEXT,
+                                 self.FIELD_SEPARATOR)
 
     def format(self, record: logging.LogRecord) -> str:
         """
         Formats a LogRecord, redacting sensitive data.
-        
+
         Args:
             record (logging.LogRecord): A record containing the log message.
-        
+
         Returns:
             str: The redacted log message.
         """
         original_message = super(SensitiveDataFormatter, self).format(record)
-        redacted_message = obfuscate_message(self.fields_to_redact, self.REDACTION_TEXT,
-                                             original_message, self.FIELD_SEPARATOR)
+        redacted_message = self.redactor.redact(original_message)
         return redacted_message
 
-def create_logger() -> logging.Logger:
+
+class BatchingHandler(logging.Handler):
+    """
+    A logging Handler that hands records to a background worker, which
+    formats (redacts) and writes them to a stream in batches.
+    The queue holds at most max_queue_size records. When it is full, the
+    "block" policy makes the logging thread wait for room and the "drop"
+    policy discards the record and counts it in dropped.
+    """
+    OVERFLOW_POLICIES = ("block", "drop")
+
+    def __init__(self, stream=None, max_queue_size: int = 10000,
+                 batch_size: int = 500, overflow: str = "block"):
+        super(BatchingHandler, self).__init__()
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.stream = stream if stream is not None else sys.stderr
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.dropped = 0
+        self._queue = queue.Queue(max_queue_size)
+        self._stop = object()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, daemon=True,
+                                        name="BatchingHandler")
+        self._worker.start()
+
+    def emit(self, record: logging.LogRecord):
+        """
+        Queues a record for the worker; only the message arguments are
+        merged here so the record no longer references mutable arguments.
+        Once the handler is closed, the record is written right away.
+
+        Args:
+            record (logging.LogRecord): A record containing the log message.
+        """
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if self._closed:
+            self._write([record])
+            return
+        if self.overflow == "block":
+            self._queue.put(record)
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+    def flush(self):
+        """
+        Waits until every queued record has been written.
+        """
+        if not self._closed:
+            self._queue.join()
+
+    def close(self):
+        """
+        Writes the remaining records and stops the worker.
+        """
+        # emit() runs under self.lock, so no record is queued after _stop
+        with self.lock:
+            stopping = not self._closed
+            if stopping:
+                self._closed = True
+                self._queue.put(self._stop)
+        if stopping:
+            self._worker.join()
+        super(BatchingHandler, self).close()
+
+    def _run(self):
+        """
+        Worker loop: waits for a record, then takes whatever else is queued
+        up to batch_size and writes it all at once.
+        """
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size and batch[-1] is not self._stop:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = batch[-1] is self._stop
+            records = batch[:-1] if stopping else batch
+            try:
+                self._write(records)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stopping:
+                return
+
+    def _write(self, records: List[logging.LogRecord]):
+        """
+        Formats records and writes them with a single write call.
+        """
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record) + "\n")
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        try:
+            self.stream.write("".join(lines))
+            self.stream.flush()
+        except Exception:
+            self.handleError(records[-1])
+
+
+def create_logger(asynchronous: bool = False, max_queue_size: int = 10000,
+                  batch_size: int = 500,
+                  overflow: str = "block") -> logging.Logger:
     """
     Creates and configures a logger for handling user data.
-    
+
+    Args:
+        asynchronous (bool): Redact and write records on a background
+            worker (see BatchingHandler) instead of the logging thread.
+        max_queue_size (int): Records queued at most in asynchronous mode.
+        batch_size (int): Records written at most per batch.
+        overflow (str): "block" or "drop" when the queue is full.
+
     Returns:
         logging.Logger: Configured logger instance.
     """
@@ -67,17 +251,23 @@ def create_logger() -> logging.Logger:
     logger.setLevel(logging.INFO)
     logger.propagate = False
 
-    stream_handler = logging.StreamHandler()
+    if asynchronous:
+        stream_handler = BatchingHandler(max_queue_size=max_queue_size,
+                                         batch_size=batch_size,
+                                         overflow=overflow)
+    else:
+        stream_handler = logging.StreamHandler()
     formatter = SensitiveDataFormatter(PII_FIELDS)
 
     stream_handler.setFormatter(formatter)
     logger.addHandler(stream_handler)
     return logger
 
+
 def connect_to_database() -> mysql.connector.connection.MySQLConnection:
     """
     Establishes a connection to the database using environment variables.
-    
+
     Returns:
         mysql.connector.connection.MySQLConnection: Database connection object.
     """
@@ -91,22 +281,453 @@ def connect_to_database() -> mysql.connector.connection.MySQLConnection:
                                          database=db_name)
     return connection
 
-def main():
+
+class ConnectionPool:
+    """
+    A bounded pool of database connections.
+    At most `size` connections are checked out at once. Connections are
+    health-checked when checked out, and connections left idle for more
+    than max_idle seconds are closed instead of being reused.
+    Connections put back are rolled back first, so no transaction or
+    snapshot leaks to the next borrower.
+    """
+
+    def __init__(self, factory=None, size: int = 5, max_idle: float = 300.0,
+                 timeout: float = None):
+        self.factory = factory if factory is not None else connect_to_database
+        self.size = size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._idle = deque()
+        self._checked_out = set()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def get(self):
+        """
+        Checks out a healthy connection, opening one if none is idle.
+
+        Raises:
+            TimeoutError: If no connection is released within timeout.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("No database connection available")
+        try:
+            while True:
+                with self._lock:
+                    evicted = self._evict_idle()
+                    connection = self._idle.pop()[0] if self._idle else None
+                for stale in evicted:
+                    self._close(stale)
+                if connection is None:
+                    break
+                if self._is_healthy(connection):
+                    return self._check_out(connection)
+                self._close(connection)
+            return self._check_out(self.factory())
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _check_out(self, connection):
+        """
+        Records a connection as checked out and returns it.
+        """
+        with self._lock:
+            self._checked_out.add(id(connection))
+        return connection
+
+    def put(self, connection):
+        """
+        Rolls back a connection checked out with get() and returns it to
+        the pool; a connection that cannot be rolled back is closed.
+
+        Raises:
+            ValueError: If the connection is not checked out of this pool.
+        """
+        with self._lock:
+            if id(connection) not in self._checked_out:
+                raise ValueError("Connection not checked out of this pool")
+            self._checked_out.discard(id(connection))
+        try:
+            connection.rollback()
+        except Exception:
+            self._close(connection)
+            connection = None
+        with self._lock:
+            if connection is not None:
+                self._idle.append((connection, time.monotonic()))
+            evicted = self._evict_idle()
+        self._slots.release()
+        for stale in evicted:
+            self._close(stale)
+
+    @contextmanager
+    def connection(self):
+        """
+        Checks out a connection for the duration of a with block; its
+        transaction is rolled back when the block ends, so commit inside
+        the block.
+        """
+        connection = self.get()
+        try:
+            yield connection
+        finally:
+            self.put(connection)
+
+    def close(self):
+        """
+        Closes every idle connection.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for connection, _ in idle:
+            self._close(connection)
+
+    def _evict_idle(self) -> list:
+        """
+        Removes the connections idle for too long, lock must be held;
+        the caller closes them once the lock is released.
+        Idle connections are kept oldest first.
+        """
+        deadline = time.monotonic() - self.max_idle
+        evicted = []
+        while self._idle and self._idle[0][1] < deadline:
+            evicted.append(self._idle.popleft()[0])
+        return evicted
+
+    @staticmethod
+    def _is_healthy(connection) -> bool:
+        """
+        Pings the server through the connection.
+        """
+        try:
+            return connection.is_connected()
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(connection):
+        """
+        Closes a connection, ignoring errors from dead connections.
+        """
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_connection_pool = None
+_connection_pool_lock = threading.Lock()
+
+
+def get_connection_pool() -> ConnectionPool:
+    """
+    Returns the process-wide pool of connect_to_database() connections,
+    sized by PERSONAL_DATA_DB_POOL_SIZE (default 5) and evicting connections
+    idle for PERSONAL_DATA_DB_POOL_MAX_IDLE seconds (default 300).
+
+    Returns:
+        ConnectionPool: The shared connection pool.
+    """
+    global _connection_pool
+    with _connection_pool_lock:
+        if _connection_pool is None:
+            size = int(os.getenv('PERSONAL_DATA_DB_POOL_SIZE') or 5)
+            max_idle = float(
+                os.getenv('PERSONAL_DATA_DB_POOL_MAX_IDLE') or 300)
+            _connection_pool = ConnectionPool(size=size, max_idle=max_idle)
+        return _connection_pool
+
+
+def peak_rss_mib() -> float:
+    """
+    Returns the peak resident set size of this process in MiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def report_progress(rows: int, started: float, stream=None):
+    """
+    Writes the number of rows exported, the throughput and the peak RSS.
+
+    Args:
+        rows (int): Rows exported so far.
+        started (float): time.monotonic() when the export started.
+        stream: Where to write the report, stderr by default.
+    """
+    stream = stream if stream is not None else sys.stderr
+    elapsed = max(time.monotonic() - started, 1e-9)
+    stream.write(f"{rows} rows in {elapsed:.1f}s "
+                 f"({rows / elapsed:.0f} rows/sec), "
+                 f"peak RSS {peak_rss_mib():.1f} MiB\n")
+
+
+def export_rows(cursor, stream, batch_size: int = 1000,
+                progress_every: float = None) -> int:
+    """
+    Writes the rows of an executed cursor to a stream as redacted log lines,
+    fetching batch_size rows at a time and writing once per batch.
+
+    Args:
+        cursor: A cursor on which a SELECT has been executed.
+        stream: Where the log lines are written.
+        batch_size (int): Rows fetched and written per batch.
+        progress_every (float): Seconds between progress reports, if any.
+
+    Returns:
+        int: The number of rows written.
+    """
+    formatter = SensitiveDataFormatter(PII_FIELDS)
+    prefixes = [f"{column[0]}=" for column in cursor.description]
+    rows = 0
+    started = last_report = time.monotonic()
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        lines = []
+        for record in batch:
+            log_message = "; ".join(
+                prefix + str(value)
+                for prefix, value in zip(prefixes, record)) + ";"
+            log_record = logging.LogRecord("user_data_logger", logging.INFO,
+                                           __file__, 0, log_message, None,
+                                           None)
+            lines.append(formatter.format(log_record) + "\n")
+        stream.write("".join(lines))
+        rows += len(batch)
+        if progress_every is not None and \
+                time.monotonic() - last_report >= progress_every:
+            report_progress(rows, started)
+            last_report = time.monotonic()
+    return rows
+
+
+def unbuffered_cursor(db_connection):
+    """
+    Opens a cursor that pulls rows from the server as they are fetched.
+    Drivers without a buffered option (sqlite3 among them) already do.
+
+    Args:
+        db_connection: Database connection object.
+
+    Returns:
+        A cursor on the connection.
+    """
+    try:
+        return db_connection.cursor(buffered=False)
+    except TypeError:
+        return db_connection.cursor()
+
+
+def placeholder(db_connection) -> str:
+    """
+    Returns the positional query parameter marker of the DB-API driver of
+    a connection: "?" for qmark drivers such as sqlite3, "%s" otherwise.
+
+    Args:
+        db_connection: Database connection object.
+    """
+    module = type(db_connection).__module__
+    while module:
+        paramstyle = getattr(sys.modules.get(module), "paramstyle", None)
+        if paramstyle is not None:
+            return "?" if paramstyle == "qmark" else "%s"
+        module = module.rpartition(".")[0]
+    return "%s"
+
+
+def stream_users(db_connection, stream=None, batch_size: int = 1000,
+                 progress_every: float = None) -> int:
+    """
+    Exports the users table through an unbuffered cursor, so rows are
+    pulled from the server batch by batch instead of all at once.
+
+    Args:
+        db_connection: Database connection object.
+        stream: Where the log lines are written, stdout by default so
+            progress reports on stderr stay separate.
+        batch_size (int): Rows fetched and written per batch.
+        progress_every (float): Seconds between progress reports, if any.
+
+    Returns:
+        int: The number of rows written.
+    """
+    stream = stream if stream is not None else sys.stdout
+    cursor = unbuffered_cursor(db_connection)
+    try:
+        cursor.execute("SELECT * FROM users;")
+        return export_rows(cursor, stream, batch_size, progress_every)
+    finally:
+        cursor.close()
+
+
+def partition_ranges(low: int, high: int,
+                     partitions: int) -> List[Tuple[int, int]]:
+    """
+    Splits the key range [low, high] into at most `partitions` half-open
+    ranges [start, end) of similar width.
+    """
+    width = max((high - low + 1 + partitions - 1) // partitions, 1)
+    return [(start, min(start + width, high + 1))
+            for start in range(low, high + 1, width)]
+
+
+def dump_partition(index: int, start: int, end: int, partition_key: str,
+                   output_dir: str, batch_size: int,
+                   connect: Callable = connect_to_database) -> Tuple[int, str]:
+    """
+    Exports the users whose partition_key is in [start, end) to its own
+    file, on its own database connection. Runs in a worker process.
+
+    Returns:
+        Tuple[int, str]: The number of rows written and the file path.
+    """
+    file_path = os.path.join(output_dir, f"users.part{index:04d}.log")
+    db_connection = connect()
+    try:
+        mark = placeholder(db_connection)
+        cursor = unbuffered_cursor(db_connection)
+        try:
+            cursor.execute("SELECT * FROM users "
+                           f"WHERE `{partition_key}` >= {mark} "
+                           f"AND `{partition_key}` < {mark} "
+                           f"ORDER BY `{partition_key}`;",
+                           (start, end))
+            with open(file_path, "w") as stream:
+                rows = export_rows(cursor, stream, batch_size)
+        finally:
+            cursor.close()
+    finally:
+        db_connection.close()
+    return rows, file_path
+
+
+def dump_partitioned(workers: int, output_dir: str, partition_key: str = "id",
+                     batch_size: int = 1000, partitions: int = None,
+                     ordered_stream=None,
+                     connect: Callable = connect_to_database) -> int:
+    """
+    Exports the users table with a pool of worker processes. The table is
+    split into ranges of its integer partition_key, each range is written
+    to output_dir/users.partNNNN.log by a worker with its own connection.
+
+    Args:
+        workers (int): Number of worker processes.
+        output_dir (str): Directory receiving the partition files.
+        partition_key (str): Integer column used to partition the table.
+        batch_size (int): Rows fetched and written per batch.
+        partitions (int): Number of ranges, 4 per worker by default.
+        ordered_stream: If given, the partition files are concatenated
+            into it in key order once every worker is done.
+        connect (Callable): Opens a database connection, called once in
+            this process and once per partition in the workers, so it must
+            be picklable (e.g. functools.partial(sqlite3.connect, path)).
+
+    Returns:
+        int: The number of rows written.
+    """
+    if not re.fullmatch(r"\w+", partition_key):
+        raise ValueError(f"Invalid partition key: {partition_key}")
+    db_connection = connect()
+    try:
+        cursor = db_connection.cursor()
+        cursor.execute(f"SELECT MIN(`{partition_key}`), "
+                       f"MAX(`{partition_key}`) FROM users;")
+        low, high = cursor.fetchone()
+        cursor.close()
+    finally:
+        db_connection.close()
+    if low is None:
+        return 0
+
+    os.makedirs(output_dir, exist_ok=True)
+    ranges = partition_ranges(int(low), int(high), partitions or workers * 4)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(dump_partition, index, start, end,
+                                   partition_key, output_dir, batch_size,
+                                   connect)
+                   for index, (start, end) in enumerate(ranges)]
+        results = [future.result() for future in futures]
+
+    if ordered_stream is not None:
+        for _, file_path in results:
+            with open(file_path) as partition:
+                shutil.copyfileobj(partition, ordered_stream)
+    return sum(rows for rows, _ in results)
+
+
+def parse_arguments(argv: List[str] = None) -> argparse.Namespace:
+    """
+    Parses the command line options of main.
+    """
+    parser = argparse.ArgumentParser(
+        description="Log the users table with PII redacted.")
+    parser.add_argument("--stream", action="store_true",
+                        help="fetch rows in batches through an unbuffered "
+                             "cursor")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="rows fetched and written per batch in "
+                             "streaming mode")
+    parser.add_argument("--progress-every", type=float, default=10.0,
+                        help="seconds between progress reports in "
+                             "streaming mode")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="dump key ranges in parallel with this many "
+                             "processes")
+    parser.add_argument("--output-dir", default="users_dump",
+                        help="directory of the per-partition files in "
+                             "parallel mode")
+    parser.add_argument("--partition-key", default="id",
+                        help="integer column used to partition the table "
+                             "in parallel mode")
+    parser.add_argument("--ordered", action="store_true",
+                        help="also write the partitions to stdout in key "
+                             "order")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None):
     """
     Main function to retrieve and log user data from the database.
     """
+    arguments = parse_arguments(argv)
+    if arguments.workers > 1:
+        started = time.monotonic()
+        rows = dump_partitioned(arguments.workers, arguments.output_dir,
+                                arguments.partition_key, arguments.batch_size,
+                                ordered_stream=(sys.stdout if arguments.ordered
+                                                else None))
+        report_progress(rows, started)
+        return
+
     db_connection = connect_to_database()
+    if arguments.stream:
+        started = time.monotonic()
+        try:
+            rows = stream_users(db_connection, batch_size=arguments.batch_size,
+                                progress_every=arguments.progress_every)
+        finally:
+            db_connection.close()
+        report_progress(rows, started)
+        return
+
     logger = create_logger()
     cursor = db_connection.cursor()
     cursor.execute("SELECT * FROM users;")
     column_names = cursor.column_names
 
     for record in cursor:
-        log_message = "".join(f"{field}={value}; " for field, value in zip(column_names, record))
+        log_message = "".join(f"{field}={value}; "
+                              for field, value in zip(column_names, record))
         logger.info(log_message.strip())
 
     cursor.close()
     db_connection.close()
 
+
 if __name__ == "__main__":
     main()
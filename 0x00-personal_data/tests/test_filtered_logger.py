@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests of the partitioned users dump against a local SQLite database.
+"""
+from functools import partial
+import io
+import os
+import re
+import sqlite3
+import tempfile
+import unittest
+
+from filtered_logger import dump_partitioned, placeholder
+
+
+class TestDumpPartitioned(unittest.TestCase):
+    """
+    dump_partitioned on a small users table, through sqlite3.
+    """
+
+    IDS = [1, 2, 3, 5, 8, 13, 21, 34, 55, 89]
+
+    def setUp(self):
+        """
+        Creates a users table with non-contiguous ids.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "users.db")
+        with sqlite3.connect(self.path) as db_connection:
+            db_connection.execute(
+                "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, "
+                "email TEXT, phone TEXT, ssn TEXT, password TEXT, ip TEXT)")
+            db_connection.executemany(
+                "INSERT INTO users VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(i, f"name{i}", f"user{i}@example.com", f"555-{i:04d}",
+                  f"ssn{i}", f"secret{i}", f"10.0.0.{i}")
+                 for i in reversed(self.IDS)])
+        self.connect = partial(sqlite3.connect, self.path)
+
+    def tearDown(self):
+        """
+        Removes the database and the dump.
+        """
+        self.directory.cleanup()
+
+    def test_placeholder(self):
+        """
+        sqlite3 connections use qmark parameters.
+        """
+        with sqlite3.connect(":memory:") as db_connection:
+            self.assertEqual(placeholder(db_connection), "?")
+
+    def test_dump(self):
+        """
+        Every row is written once, in key order, with PII redacted.
+        """
+        output_dir = os.path.join(self.directory.name, "dump")
+        ordered = io.StringIO()
+        rows = dump_partitioned(2, output_dir, batch_size=2, partitions=4,
+                                ordered_stream=ordered, connect=self.connect)
+
+        self.assertEqual(rows, len(self.IDS))
+        self.assertGreaterEqual(len(os.listdir(output_dir)), 2)
+        lines = ordered.getvalue().splitlines()
+        self.assertEqual(len(lines), len(self.IDS))
+        ids = [int(re.search(r"id=(\d+);", line).group(1)) for line in lines]
+        self.assertEqual(ids, self.IDS)
+        for i, line in zip(self.IDS, lines):
+            for field in ("name", "email", "phone", "ssn", "password"):
+                self.assertIn(f"{field}=***;", line)
+            self.assertIn(f"ip=10.0.0.{i};", line)
+            self.assertNotIn("example.com", line)
+            self.assertNotIn(f"secret{i}", line)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,14 @@ elif AUTH_TYPE == "basic_auth":
     from api.v1.auth.basic_auth import BasicAuth
     auth = BasicAuth()
 
+if auth is not None:
+    from api.v1.auth.auth import PathMatcher
+    excluded_paths = PathMatcher([
+        '/api/v1/status/',
+        '/api/v1/unauthorized/',
+        '/api/v1/forbidden/'
+    ])
+
 
 @app.before_request
 def before_request_filter():
@@ -31,11 +39,6 @@ def before_request_filter():
     """
     if auth is None:
         return
-    excluded_paths = [
-        '/api/v1/status/',
-        '/api/v1/unauthorized/',
-        '/api/v1/forbidden/'
-    ]
     if auth.require_auth(request.path, excluded_paths):
         if auth.authorization_header(request) is None:
             abort(401, description="Unauthorized")
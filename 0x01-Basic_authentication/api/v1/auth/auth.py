@@ -9,6 +9,56 @@ from typing import (
 )
 
 
+class PathMatcher:
+    """
+    Matches endpoints against a fixed list of bypass paths
+    The paths are kept in a character trie, so a lookup costs
+    O(len(endpoint)) whatever the number of paths.
+    """
+    _END = None
+
+    def __init__(self, bypass_paths: List[str]):
+        """
+        Compiles a list of bypass paths
+        Args:
+            - bypass_paths (List of str): paths, optionally ending in "*"
+        """
+        self.bypass_paths = list(bypass_paths)
+        self._trie = {}
+        for path in self.bypass_paths:
+            node = self._trie
+            for index, char in enumerate(path):
+                if char == "*" and index == len(path) - 1:
+                    node[self._END] = True  # wildcard prefix ends here
+                node = node.setdefault(char, {})
+            node[self._END] = True
+
+    def __len__(self) -> int:
+        """
+        Number of bypass paths
+        """
+        return len(self.bypass_paths)
+
+    def matches(self, endpoint: str) -> bool:
+        """
+        Checks whether an endpoint bypasses authentication, that is when
+        a bypass path (without its "*") is a prefix of the endpoint, or the
+        endpoint is a prefix of a bypass path
+        Args:
+            - endpoint (str): URL endpoint to evaluate
+        Returns:
+            - True if the endpoint bypasses authentication
+        """
+        node = self._trie
+        for char in endpoint:
+            if self._END in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                return False
+        return True
+
+
 class Auth:
     """
     Handles API authentication
@@ -18,27 +68,19 @@ class Auth:
         Checks if authentication is needed for a specific endpoint
         Args:
             - endpoint (str): URL endpoint to evaluate
-            - bypass_paths (List of str): List of endpoints that do not require
-              authentication
+            - bypass_paths (List of str or PathMatcher): List of endpoints
+              that do not require authentication; pass a PathMatcher built
+              once to avoid compiling the list on every call
         Returns:
             - True if endpoint is not in bypass_paths, otherwise False
         """
         if endpoint is None:
             return True
-        elif bypass_paths is None or bypass_paths == []:
+        elif bypass_paths is None or len(bypass_paths) == 0:
             return True
-        elif endpoint in bypass_paths:
-            return False
-        else:
-            for path in bypass_paths:
-                if path.startswith(endpoint):
-                    return False
-                if endpoint.startswith(path):
-                    return False
-                if path[-1] == "*":
-                    if endpoint.startswith(path[:-1]):
-                        return False
-        return True
+        if not isinstance(bypass_paths, PathMatcher):
+            bypass_paths = PathMatcher(bypass_paths)
+        return not bypass_paths.matches(endpoint)
 
     def get_authorization_header(self, request=None) -> str:
         """
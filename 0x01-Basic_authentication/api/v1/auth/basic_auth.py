@@ -3,8 +3,10 @@
 Definition of the BasicAuth class
 """
 import base64
+import os
 from .auth import Auth
-from typing import TypeVar
+from .credential_cache import CredentialCache
+from typing import TypeVar, Tuple
 
 from models.user import User
 
@@ -12,6 +14,27 @@ from models.user import User
 class BasicAuth(Auth):
     """ Implements methods for Basic Authorization protocol
     """
+    def __init__(self):
+        """
+        Initialize the cache of verified Authorization headers, sized by
+        BASIC_AUTH_CACHE_SIZE (default 10000, 0 disables it) and expiring
+        after BASIC_AUTH_CACHE_TTL seconds (default 60)
+        """
+        try:
+            max_size = int(os.getenv('BASIC_AUTH_CACHE_SIZE', 10000))
+            ttl = float(os.getenv('BASIC_AUTH_CACHE_TTL', 60))
+        except ValueError:
+            max_size, ttl = 10000, 60.0
+        self.credential_cache = CredentialCache(max_size, ttl)
+        User.subscribe(self.credential_cache.on_user_change)
+
+    def close(self):
+        """
+        Stops listening to User changes and empties the credential cache
+        """
+        User.unsubscribe(self.credential_cache.on_user_change)
+        self.credential_cache.clear()
+
     def get_base64_authorization_token(self, authorization_header: str) -> str:
         """
         Extracts the Base64 token from the Authorization header for Basic Auth
@@ -61,28 +84,56 @@ class BasicAuth(Auth):
             return None
         if user_pwd is None or not isinstance(user_pwd, str):
             return None
+        return self._verify_credentials(user_email, user_pwd)[0]
+
+    def _verify_credentials(self, user_email: str,
+                            user_pwd: str) -> Tuple[TypeVar('User'), str]:
+        """
+        Returns the User matching email and password, and the password
+        hash it was verified against, or (None, None)
+        """
+        if user_email is None or not isinstance(user_email, str):
+            return (None, None)
+        if user_pwd is None or not isinstance(user_pwd, str):
+            return (None, None)
         try:
             users = User.search({"email": user_email})
-            if not users:
-                return None
             for user in users:
-                if user.is_valid_password(user_pwd):
-                    return user
-            return None
+                hashed = user.password
+                if user.is_valid_password(user_pwd) and \
+                        user.password == hashed:
+                    return (user, hashed)
+            return (None, None)
         except Exception:
-            return None
+            return (None, None)
 
     def get_current_user(self, request=None) -> TypeVar('User'):
         """
         Retrieves a User instance based on the given request
+        Headers verified recently are served from the credential cache.
         """
         auth_header = self.authorization_header(request)
-        if auth_header is not None:
-            token = self.get_base64_authorization_token(auth_header)
-            if token is not None:
-                decoded_token = self.decode_base64_token(token)
-                if decoded_token is not None:
-                    email, password = self.extract_user_credentials(decoded_token)
-                    if email is not None:
-                        return self.find_user_from_credentials(email, password)
+        if auth_header is None:
+            return None
+        user_id = self.credential_cache.get(auth_header)
+        if user_id is not None:
+            user = User.get(user_id)
+            if user is not None:
+                return user
+        token = self.get_base64_authorization_token(auth_header)
+        if token is not None:
+            decoded_token = self.decode_base64_token(token)
+            if decoded_token is not None:
+                email, password = self.extract_user_credentials(decoded_token)
+                if email is not None:
+                    user, hashed = self._verify_credentials(email, password)
+                    if user is not None:
+                        self.credential_cache.put(auth_header, user.id,
+                                                  email, hashed)
+                        if user.password != hashed or user.email != email:
+                            # changed since verified, maybe before its
+                            # listener ran
+                            self.credential_cache.invalidate_user(
+                                user.id, user.email, user.password)
+                    return user
         return None
@@ -42,3 +42,15 @@ def stats() -> str:
     stats = {}
     stats['users'] = User.count()
     return jsonify(stats)
+
+
+@app_views.route('/stats/credentials', methods=['GET'], strict_slashes=False)
+def credential_stats() -> str:
+    """ GET /api/v1/stats/credentials
+    Return:
+      - the size and hit/miss counters of the credential cache
+    """
+    from api.v1.app import auth
+    if not hasattr(auth, 'credential_cache'):
+        abort(404)
+    return jsonify(auth.credential_cache.stats())
@@ -2,18 +2,105 @@
 """ Module of Users views
 """
 from api.v1.views import app_views
-from flask import abort, jsonify, request
+from flask import abort, jsonify, request, Response
+from models.base import TIMESTAMP_FORMAT
 from models.user import User
+import base64
+import heapq
+import json
+
+
+def _sort_key(user: User) -> tuple:
+    """ Stable ordering of users for pagination: created_at, then id
+    """
+    return (user.created_at.strftime(TIMESTAMP_FORMAT), user.id)
+
+
+def _encode_cursor(key: tuple) -> str:
+    """ Opaque cursor pointing right after the user with sort key `key`
+    """
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """ Sort key encoded in a cursor, None if there is no cursor
+    """
+    if cursor is None:
+        return None
+    try:
+        created_at, user_id = json.loads(base64.urlsafe_b64decode(cursor))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(created_at, str) or not isinstance(user_id, str):
+        raise ValueError("Invalid cursor")
+    return (created_at, user_id)
+
+
+def _parse_limit(limit: str) -> int:
+    """ Page size from the query string, None if there is no limit
+    """
+    if limit is None:
+        return None
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise ValueError("Invalid limit")
+    if limit <= 0:
+        raise ValueError("Invalid limit")
+    return limit
+
+
+def _ndjson(users: list):
+    """ Yield one JSON represented user per line
+    """
+    for user in users:
+        yield json.dumps(user.to_json()) + "\n"
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 def view_all_users() -> str:
     """ GET /api/v1/users
+    Query parameters (optional):
+      - limit: maximum number of users to return
+      - cursor: X-Next-Cursor header of the previous page
+      - format: "ndjson" to stream one JSON object per line
     Return:
       - list of all User objects JSON represented
+      - ordered by created_at and id when paginated or streamed, with an
+        X-Next-Cursor header when more users remain
+      - 400 if limit or cursor is invalid
     """
-    all_users = [user.to_json() for user in User.all()]
-    return jsonify(all_users)
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    stream = request.args.get('format') == 'ndjson'
+    if limit is None and cursor is None and not stream:
+        all_users = [user.to_json() for user in User.all()]
+        return jsonify(all_users)
+
+    try:
+        limit = _parse_limit(limit)
+        after = _decode_cursor(cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    users = (user for user in User.all()
+             if after is None or _sort_key(user) > after)
+    if limit is None:
+        page = sorted(users, key=_sort_key)
+    else:
+        page = heapq.nsmallest(limit + 1, users, key=_sort_key)
+    next_cursor = None
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        next_cursor = _encode_cursor(_sort_key(page[-1]))
+
+    if stream:
+        response = Response(_ndjson(page), mimetype='application/x-ndjson')
+    else:
+        response = jsonify([user.to_json() for user in page])
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
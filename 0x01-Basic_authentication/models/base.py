@@ -3,18 +3,26 @@
 """
 from datetime import datetime
 from typing import TypeVar, List, Iterable
-from os import path
-import json
 import uuid
 
+from models.storage import storage_from_env
+
 
 TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
 DATA = {}
+INDEXES = {}
+INDEXED_VALUES = {}
+LISTENERS = {}
+STORAGE = storage_from_env()
 
 
 class Base():
     """ Base class
+
+    Subclasses list in `_indexes` the attributes `search()` can look up
+    through a hash index instead of scanning every object
     """
+    _indexes = ()
 
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a Base instance
@@ -62,28 +70,30 @@ class Base():
         """ Load all objects from file
         """
         s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
         DATA[s_class] = {}
-        if not path.exists(file_path):
-            return
-
-        with open(file_path, 'r') as f:
-            objs_json = json.load(f)
-            for obj_id, obj_json in objs_json.items():
-                DATA[s_class][obj_id] = cls(**obj_json)
+        INDEXES[s_class] = {}
+        INDEXED_VALUES[s_class] = {}
+        objs_json = STORAGE.load(s_class)
+        for obj_id, obj_json in objs_json.items():
+            obj = cls(**obj_json)
+            DATA[s_class][obj_id] = obj
+            obj._index()
 
     @classmethod
     def save_to_file(cls):
         """ Save all objects to file
         """
+        STORAGE.dump(cls.__name__, cls._objs_json())
+
+    @classmethod
+    def _objs_json(cls) -> dict:
+        """ Serialize all objects, by ID
+        """
         s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
         objs_json = {}
         for obj_id, obj in DATA[s_class].items():
             objs_json[obj_id] = obj.to_json(True)
-
-        with open(file_path, 'w') as f:
-            json.dump(objs_json, f)
+        return objs_json
 
     def save(self):
         """ Save current object
@@ -91,7 +101,10 @@ class Base():
         s_class = self.__class__.__name__
         self.updated_at = datetime.utcnow()
         DATA[s_class][self.id] = self
-        self.__class__.save_to_file()
+        self._index()
+        STORAGE.write(s_class, self.id, self.to_json(True),
+                      self.__class__._objs_json)
+        self._notify("save")
 
     def remove(self):
         """ Remove object
@@ -99,7 +112,67 @@ class Base():
         s_class = self.__class__.__name__
         if DATA[s_class].get(self.id) is not None:
             del DATA[s_class][self.id]
-            self.__class__.save_to_file()
+            self._unindex()
+            STORAGE.delete(s_class, self.id, self.__class__._objs_json)
+            self._notify("remove")
+
+    @classmethod
+    def subscribe(cls, callback: callable):
+        """ Call callback(obj, event) after an object of this class is
+        saved (event "save") or removed (event "remove")
+        """
+        LISTENERS.setdefault(cls.__name__, []).append(callback)
+
+    @classmethod
+    def unsubscribe(cls, callback: callable):
+        """ Stop calling a callback registered with subscribe()
+        """
+        callbacks = LISTENERS.get(cls.__name__, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def _notify(self, event: str):
+        """ Call the listeners of this class
+        """
+        for callback in LISTENERS.get(self.__class__.__name__, ()):
+            callback(self, event)
+
+    def _index(self):
+        """ Add the current values of the indexed attributes to the indexes
+        """
+        if not self._indexes:
+            return
+        s_class = self.__class__.__name__
+        self._unindex()
+        indexes = INDEXES.setdefault(s_class, {})
+        values = {}
+        for attribute in self._indexes:
+            value = getattr(self, attribute, None)
+            try:
+                bucket = indexes.setdefault(attribute, {}).setdefault(value,
+                                                                      {})
+            except TypeError:
+                # unhashable values are only found by a full scan
+                continue
+            bucket[self.id] = self
+            values[attribute] = value
+        INDEXED_VALUES.setdefault(s_class, {})[self.id] = values
+
+    def _unindex(self):
+        """ Remove the last indexed values of this object from the indexes
+        """
+        s_class = self.__class__.__name__
+        values = INDEXED_VALUES.get(s_class, {}).pop(self.id, None)
+        if values is None:
+            return
+        indexes = INDEXES[s_class]
+        for attribute, value in values.items():
+            bucket = indexes[attribute].get(value)
+            if bucket is None:
+                continue
+            bucket.pop(self.id, None)
+            if len(bucket) == 0:
+                del indexes[attribute][value]
 
     @classmethod
     def count(cls) -> int:
@@ -124,6 +197,9 @@ class Base():
     @classmethod
     def search(cls, attributes: dict = {}) -> List[TypeVar('Base')]:
         """ Search all objects with matching attributes
+
+        Indexes only reflect saved values: candidates found through an
+        index are still checked against every attribute
         """
         s_class = cls.__name__
         def _search(obj):
@@ -133,5 +209,15 @@ class Base():
                 if (getattr(obj, k) != v):
                     return False
             return True
-        
-        return list(filter(_search, DATA[s_class].values()))
+
+        candidates = DATA[s_class].values()
+        indexes = INDEXES.get(s_class, {})
+        for k, v in attributes.items():
+            if k not in cls._indexes:
+                continue
+            try:
+                candidates = indexes.get(k, {}).get(v, {}).values()
+            except TypeError:
+                continue
+            break
+        return list(filter(_search, candidates))
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+""" Storage engines used by models.base.Base
+"""
+from os import getenv, path
+import json
+import os
+import threading
+
+
+class FileStorage():
+    """ Rewrite the whole `.db_<class>.json` file on every change
+    """
+
+    def __init__(self, prefix: str = ".db_"):
+        """ Initialize a FileStorage
+        """
+        self.prefix = prefix
+
+    def snapshot_path(self, s_class: str) -> str:
+        """ Path of the JSON snapshot of a class
+        """
+        return "{}{}.json".format(self.prefix, s_class)
+
+    def load(self, s_class: str) -> dict:
+        """ Return all serialized objects of a class, by ID
+        """
+        return self._read_snapshot(s_class)
+
+    def dump(self, s_class: str, objs_json: dict):
+        """ Persist all serialized objects of a class
+        """
+        self._write_snapshot(s_class, objs_json)
+
+    def write(self, s_class: str, obj_id: str, obj_json: dict,
+              objs_json: callable):
+        """ Persist a created or updated object
+
+        `objs_json` returns the serialization of every object of the
+        class, for engines that can only store full snapshots
+        """
+        self.dump(s_class, objs_json())
+
+    def delete(self, s_class: str, obj_id: str, objs_json: callable):
+        """ Persist the removal of an object
+        """
+        self.dump(s_class, objs_json())
+
+    def _read_snapshot(self, s_class: str) -> dict:
+        """ Read the JSON snapshot of a class
+        """
+        file_path = self.snapshot_path(s_class)
+        if not path.exists(file_path):
+            return {}
+        with open(file_path, 'r') as f:
+            return json.load(f)
+
+    def _write_snapshot(self, s_class: str, objs_json: dict):
+        """ Atomically replace the JSON snapshot of a class
+        """
+        file_path = self.snapshot_path(s_class)
+        tmp_path = "{}.tmp".format(file_path)
+        with open(tmp_path, 'w') as f:
+            json.dump(objs_json, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+
+
+class JournalStorage(FileStorage):
+    """ Append one record per save/delete to `.db_<class>.journal`
+
+    The journal is periodically folded into the JSON snapshot by a
+    background thread. Loading replays the snapshot, then the journal
+    being compacted (if a compaction was interrupted), then the journal.
+    """
+
+    def __init__(self, prefix: str = ".db_", compact_every: int = 1000):
+        """ Initialize a JournalStorage
+        """
+        super().__init__(prefix)
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._journals = {}
+        self._pending = {}
+        self._compactors = {}
+
+    def journal_path(self, s_class: str) -> str:
+        """ Path of the journal of a class
+        """
+        return "{}{}.journal".format(self.prefix, s_class)
+
+    def load(self, s_class: str) -> dict:
+        """ Replay snapshot and journals of a class
+        """
+        objs_json = self._read_snapshot(s_class)
+        journal_path = self.journal_path(s_class)
+        count = self._replay("{}.1".format(journal_path), objs_json)
+        count += self._replay(journal_path, objs_json)
+        with self._lock:
+            self._pending[s_class] = count
+        return objs_json
+
+    def dump(self, s_class: str, objs_json: dict):
+        """ Write a full snapshot and start a new, empty journal
+        """
+        with self._compact_lock, self._lock:
+            self._close_journal(s_class)
+            self._write_snapshot(s_class, objs_json)
+            journal_path = self.journal_path(s_class)
+            for file_path in (journal_path, "{}.1".format(journal_path)):
+                if path.exists(file_path):
+                    os.remove(file_path)
+            self._pending[s_class] = 0
+
+    def write(self, s_class: str, obj_id: str, obj_json: dict,
+              objs_json: callable):
+        """ Append a save record to the journal
+        """
+        self._append(s_class, {"op": "save", "id": obj_id, "obj": obj_json})
+
+    def delete(self, s_class: str, obj_id: str, objs_json: callable):
+        """ Append a delete record to the journal
+        """
+        self._append(s_class, {"op": "delete", "id": obj_id})
+
+    def compact(self, s_class: str):
+        """ Fold the journal of a class into its snapshot
+
+        The live journal is rotated under the lock; folding only reads
+        files, so saves can keep appending while it runs.
+        """
+        with self._compact_lock:
+            self._compact(s_class)
+
+    def _compact(self, s_class: str):
+        """ Rotate the journal and fold it, compact lock must be held
+        """
+        journal_path = self.journal_path(s_class)
+        rotated_path = "{}.1".format(journal_path)
+        with self._lock:
+            self._close_journal(s_class)
+            if path.exists(journal_path):
+                if path.exists(rotated_path):
+                    with open(rotated_path, 'a') as dst, \
+                            open(journal_path, 'r') as src:
+                        dst.write(src.read())
+                    os.remove(journal_path)
+                else:
+                    os.replace(journal_path, rotated_path)
+            self._pending[s_class] = 0
+        objs_json = self._read_snapshot(s_class)
+        self._replay(rotated_path, objs_json)
+        self._write_snapshot(s_class, objs_json)
+        if path.exists(rotated_path):
+            os.remove(rotated_path)
+
+    def _append(self, s_class: str, record: dict):
+        """ Append a record and schedule a compaction if needed
+        """
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            journal = self._journals.get(s_class)
+            if journal is None:
+                journal = self._open_journal(s_class)
+                self._journals[s_class] = journal
+            journal.write(line)
+            journal.flush()
+            self._pending[s_class] = self._pending.get(s_class, 0) + 1
+            if self._pending[s_class] < self.compact_every:
+                return
+            compactor = self._compactors.get(s_class)
+            if compactor is not None and compactor.is_alive():
+                return
+            compactor = threading.Thread(target=self.compact,
+                                         args=(s_class,), daemon=True)
+            self._compactors[s_class] = compactor
+        compactor.start()
+
+    def _open_journal(self, s_class: str):
+        """ Open the journal of a class for appending
+        """
+        journal_path = self.journal_path(s_class)
+        torn = False
+        if path.exists(journal_path) and path.getsize(journal_path) > 0:
+            with open(journal_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+        journal = open(journal_path, 'a')
+        if torn:
+            # terminate a record torn by a crash
+            journal.write("\n")
+        return journal
+
+    def _close_journal(self, s_class: str):
+        """ Close the open journal of a class, lock must be held
+        """
+        journal = self._journals.pop(s_class, None)
+        if journal is not None:
+            journal.close()
+
+    @staticmethod
+    def _replay(file_path: str, objs_json: dict) -> int:
+        """ Apply the records of a journal file to `objs_json`
+        """
+        if not path.exists(file_path):
+            return 0
+        count = 0
+        with open(file_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # record torn by a crash
+                    continue
+                if record.get("op") == "save":
+                    objs_json[record["id"]] = record["obj"]
+                else:
+                    objs_json.pop(record["id"], None)
+                count += 1
+        return count
+
+
+def storage_from_env() -> FileStorage:
+    """ Return the storage engine selected by STORAGE_TYPE
+    """
+    if getenv("STORAGE_TYPE") == "journal":
+        try:
+            compact_every = int(getenv("JOURNAL_COMPACT_EVERY", 1000))
+        except ValueError:
+            compact_every = 1000
+        return JournalStorage(compact_every=max(compact_every, 1))
+    return FileStorage()
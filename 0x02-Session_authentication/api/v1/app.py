@@ -31,6 +31,19 @@ elif AUTH_METHOD == "session_exp_auth":
 elif AUTH_METHOD == "session_db_auth":
     from api.v1.auth.session_db_auth import SessionDBAuth
     authentication = SessionDBAuth()
+elif AUTH_METHOD == "signed_session_auth":
+    from api.v1.auth.signed_session_auth import SignedSessionAuth
+    authentication = SignedSessionAuth()
+
+# Paths reachable without authentication, compiled once
+if authentication is not None:
+    from api.v1.auth.auth import PathMatcher
+    excluded_paths = PathMatcher([
+        '/api/v1/status/',
+        '/api/v1/unauthorized/',
+        '/api/v1/forbidden/',
+        '/api/v1/auth_session/login/'
+    ])
 
 @app.before_request
 def before_request_handler():
@@ -40,21 +53,16 @@ def before_request_handler():
     if authentication is None:
         return  # No authentication configured
     else:
-        # Set the current user on the request object
-        setattr(request, "current_user", authentication.current_user(request))
-        excluded_paths = [
-            '/api/v1/status/',
-            '/api/v1/unauthorized/',
-            '/api/v1/forbidden/',
-            '/api/v1/auth_session/login/'
-        ]
+        # Resolve the current user once and set it on the request object
+        current_user = authentication.resolve_user(request)
+        setattr(request, "current_user", current_user)
         if authentication.require_auth(request.path, excluded_paths):
             session_token = authentication.session_cookie(request)
             # If no auth header or session token, abort with 401 Unauthorized
             if authentication.authorization_header(request) is None and session_token is None:
                 abort(401, description="Unauthorized")
             # If user cannot be identified, abort with 403 Forbidden
-            if authentication.current_user(request) is None:
+            if current_user is None:
                 abort(403, description="Forbidden")
 
 # Custom error handler for 404 Not Found
@@ -3,8 +3,63 @@
 Definition of class Auth
 """
 import os
-from flask import request
+from flask import g, request
 from typing import List, TypeVar
+from .timing import StageTimer
+
+
+class PathMatcher:
+    """
+    Matches paths against a fixed list of excluded paths
+    Exact paths are kept in a set and "*"-suffixed paths in a character
+    trie, so a lookup costs O(len(path)) whatever the number of paths.
+    Trailing slashes are ignored on both sides.
+    """
+
+    def __init__(self, excluded_paths: List[str]):
+        """
+        Compiles a list of excluded paths
+        Args:
+            excluded_paths (List[str]): exact paths or prefixes ending in "*"
+        """
+        self.excluded_paths = list(excluded_paths)
+        self._exact = set()
+        self._prefixes = {}
+        for excluded_path in self.excluded_paths:
+            normalized_excluded = excluded_path.rstrip('/')
+            if normalized_excluded.endswith('*'):
+                node = self._prefixes
+                for char in normalized_excluded[:-1]:
+                    node = node.setdefault(char, {})
+                node[None] = True  # a prefix ends here
+            else:
+                self._exact.add(normalized_excluded)
+
+    def __len__(self) -> int:
+        """
+        Number of excluded paths
+        """
+        return len(self.excluded_paths)
+
+    def matches(self, path: str) -> bool:
+        """
+        Checks whether a path is excluded
+        Args:
+            path (str): URL path to be checked
+        Returns:
+            bool: True if path equals an exact path or starts with a prefix
+        """
+        path = path.rstrip('/')
+        if path in self._exact:
+            return True
+        node = self._prefixes
+        for char in path:
+            if None in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                return False
+        return None in node
 
 
 class Auth:
@@ -12,12 +67,17 @@ class Auth:
     Manages the API authentication
     """
 
+    # Time spent in each authentication stage, shared by every Auth
+    timer = StageTimer()
+
     def require_auth(self, path: str, excluded_paths: List[str]) -> bool:
         """
         Determines whether a given path requires authentication
         Args:
             path (str): URL path to be checked
-            excluded_paths (List[str]): List of paths that do not require authentication
+            excluded_paths (List[str] or PathMatcher): Paths that do not
+              require authentication; pass a PathMatcher built once to
+              avoid compiling the list on every call
         Returns:
             bool: True if path is not in excluded_paths, else False
         """
@@ -25,20 +85,9 @@ class Auth:
             return True
         if not excluded_paths:
             return True
-
-        # Normalize paths by removing trailing slashes for consistent comparison
-        path = path.rstrip('/')
-        for excluded_path in excluded_paths:
-            # Normalize excluded_path similarly
-            normalized_excluded = excluded_path.rstrip('/')
-            # Handle wildcard match (e.g., "path/*")
-            if normalized_excluded.endswith('*'):
-                if path.startswith(normalized_excluded[:-1]):
-                    return False
-            elif path == normalized_excluded:
-                return False
-
-        return True
+        if not isinstance(excluded_paths, PathMatcher):
+            excluded_paths = PathMatcher(excluded_paths)
+        return not excluded_paths.matches(path)
 
     def authorization_header(self, request=None) -> str:
         """
@@ -62,6 +111,31 @@ class Auth:
         """
         return None
 
+    def destroy_all_sessions(self, user_id: str = None) -> int:
+        """
+        Destroys every session of a user
+        Args:
+            user_id (str): User's ID
+        Returns:
+            int: Number of destroyed sessions
+        """
+        return 0
+
+    def resolve_user(self, request=None) -> TypeVar('User'):
+        """
+        Returns current_user(request), computed at most once per request
+        Args:
+            request (Flask request object): Request object
+        Returns:
+            TypeVar('User'): A User instance or None
+        """
+        if request is None:
+            return self.current_user(request)
+        if "_auth_user" not in g:
+            with self.timer.stage("resolve_user"):
+                g._auth_user = self.current_user(request)
+        return g._auth_user
+
     def session_cookie(self, request=None):
         """
         Retrieves the session cookie from a request
@@ -3,14 +3,37 @@
 Definition of class BasicAuth
 """
 import base64
+import os
 from .auth import Auth
+from .credential_cache import CredentialCache
 from typing import TypeVar, Tuple
 from models.user import User
 
 
 class BasicAuth(Auth):
     """ Implements Basic Authorization protocol methods """
-    
+
+    def __init__(self):
+        """
+        Initialize the cache of verified Authorization headers, sized by
+        BASIC_AUTH_CACHE_SIZE (default 10000, 0 disables it) and expiring
+        after BASIC_AUTH_CACHE_TTL seconds (default 60)
+        """
+        try:
+            max_size = int(os.getenv('BASIC_AUTH_CACHE_SIZE', 10000))
+            ttl = float(os.getenv('BASIC_AUTH_CACHE_TTL', 60))
+        except ValueError:
+            max_size, ttl = 10000, 60.0
+        self.credential_cache = CredentialCache(max_size, ttl)
+        User.subscribe(self.credential_cache.on_user_change)
+
+    def close(self):
+        """
+        Stops listening to User changes and empties the credential cache
+        """
+        User.unsubscribe(self.credential_cache.on_user_change)
+        self.credential_cache.clear()
+
     def extract_base64_authorization_header(self, authorization_header: str) -> str:
         """
         Extracts the Base64 part of the Authorization header for a Basic Authorization
@@ -52,28 +75,58 @@ class BasicAuth(Auth):
             return None
         if user_pwd is None or not isinstance(user_pwd, str):
             return None
+        return self._verify_credentials(user_email, user_pwd)[0]
+
+    def _verify_credentials(self, user_email: str,
+                            user_pwd: str) -> Tuple[TypeVar('User'), str]:
+        """
+        Returns the User matching email and password, and the password
+        hash it was verified against, or (None, None)
+        """
+        if user_email is None or not isinstance(user_email, str):
+            return None, None
+        if user_pwd is None or not isinstance(user_pwd, str):
+            return None, None
         try:
-            users = User.search({"email": user_email})
-            if not users:
-                return None
-            for user in users:
-                if user.is_valid_password(user_pwd):
-                    return user
-            return None
+            with self.timer.stage("user_search"):
+                users = User.search({"email": user_email})
+            with self.timer.stage("password_check"):
+                for user in users:
+                    hashed = user.password
+                    if user.is_valid_password(user_pwd) and \
+                            user.password == hashed:
+                        return user, hashed
+            return None, None
         except Exception:
-            return None
+            return None, None
 
     def current_user(self, request=None) -> TypeVar('User'):
         """
         Returns a User instance based on a received request
+        Headers verified recently are served from the credential cache.
         """
         auth_header = self.authorization_header(request)
-        if auth_header:
+        if not auth_header:
+            return None
+        with self.timer.stage("credential_cache"):
+            user_id = self.credential_cache.get(auth_header)
+            user = User.get(user_id) if user_id is not None else None
+        if user is not None:
+            return user
+        with self.timer.stage("decode_header"):
+            email, password = None, None
             token = self.extract_base64_authorization_header(auth_header)
             if token:
                 decoded = self.decode_base64_authorization_header(token)
                 if decoded:
                     email, password = self.extract_user_credentials(decoded)
-                    if email:
-                        return self.user_object_from_credentials(email, password)
-        return None
+        if not email:
+            return None
+        user, hashed = self._verify_credentials(email, password)
+        if user is not None:
+            self.credential_cache.put(auth_header, user.id, email, hashed)
+            if user.password != hashed or user.email != email:
+                # changed since verified, maybe before its listener ran
+                self.credential_cache.invalidate_user(user.id, user.email,
+                                                      user.password)
+        return user
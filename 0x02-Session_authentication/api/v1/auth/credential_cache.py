@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Definition of class CredentialCache
+"""
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class CredentialCache:
+    """
+    Bounded LRU cache, with a TTL, of verified Authorization headers
+    Headers are stored as an HMAC digest under a per-process random key,
+    never in clear, and map to the ID of the user they authenticate.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        """
+        Initialize an empty cache
+        Args:
+            max_size (int): Maximum number of cached headers, 0 disables
+            ttl (float): Seconds a verified header stays cached
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._key = os.urandom(32)
+        self._lock = threading.Lock()
+        # digest -> (user_id, email, password hash, expiry)
+        self._entries = OrderedDict()
+        # user_id -> digests of the headers authenticating that user
+        self._by_user = {}
+
+    def digest(self, authorization_header: str) -> bytes:
+        """
+        Keyed digest of an Authorization header
+        """
+        return hmac.new(self._key, authorization_header.encode('utf-8'),
+                        hashlib.sha256).digest()
+
+    def get(self, authorization_header: str) -> str:
+        """
+        Returns the user ID a header was verified for, or None
+        """
+        if self.max_size <= 0:
+            return None
+        key = self.digest(authorization_header)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[3] < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, authorization_header: str, user_id: str, email: str,
+            password: str):
+        """
+        Caches a header verified for a user
+        Args:
+            authorization_header (str): The verified header
+            user_id (str): ID of the authenticated user
+            email (str): Email of the user when verified
+            password (str): Password hash of the user when verified
+        """
+        if self.max_size <= 0:
+            return
+        key = self.digest(authorization_header)
+        expiry = time.monotonic() + self.ttl
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (user_id, email, password, expiry)
+            self._by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: str, email: str = None,
+                        password: str = None):
+        """
+        Drops the headers cached for a user; if email and password are
+        given, only the headers verified for other credentials are dropped
+        """
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                _, cached_email, cached_password, _ = self._entries[key]
+                if password is not None and cached_password == password \
+                        and cached_email == email:
+                    continue
+                self._remove(key)
+                self.invalidations += 1
+
+    def on_user_change(self, user, event: str):
+        """
+        Model listener: a removed user loses every cached header, a saved
+        one the headers of its previous email or password
+        """
+        if event == "remove":
+            self.invalidate_user(user.id)
+        else:
+            self.invalidate_user(user.id, user.email, user.password)
+
+    def clear(self):
+        """
+        Drops every cached header
+        """
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the size and hit/miss/eviction/invalidation counters
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+    def _remove(self, key: bytes):
+        """
+        Removes a digest from the cache, lock must be held
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_user.get(entry[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[entry[0]]
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Definition of class NotifyFile
+"""
+import fcntl
+import os
+import threading
+from typing import Callable, List
+
+
+class NotifyFile:
+    """
+    Append-only file of lines shared by the workers of a host
+    Writers append under an exclusive lock on "<path>.lock". Past
+    max_bytes, the writer holding the lock replaces the file with the
+    lines `compact` keeps, under a "#<generation>" header line. Readers
+    keep the file open, so after one replacement they finish reading
+    the old file before reading the new one and miss no line; if they
+    skipped a whole generation, on_gap is called instead.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1 << 20,
+                 compact: Callable[[List[str]], List[str]] = None,
+                 from_start: bool = False, on_gap: Callable = None):
+        """
+        Open the file for reading
+        Args:
+            path (str): Path of the shared file
+            max_bytes (int): Size above which the file is compacted
+            compact (callable): Returns the lines to keep from the lines
+              of the file, none are kept if None
+            from_start (bool): Whether the first poll returns the lines
+              already in the file
+            on_gap (callable): Called without arguments when lines of a
+              skipped generation may have been missed
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compact = compact
+        self.on_gap = on_gap
+        self._lock = threading.Lock()
+        self._file = None
+        self._generation = 0
+        self._partial = b""
+        self._open(from_start)
+
+    def publish(self, lines: List[str]):
+        """
+        Appends lines to the file, compacting it when too big
+        """
+        if not lines:
+            return
+        data = "".join(line + "\n" for line in lines).encode('utf-8')
+        with open(self.path + ".lock", 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            with open(self.path, 'ab') as f:
+                f.write(data)
+                size = f.tell()
+            if size > self.max_bytes:
+                self._rotate()
+
+    def poll(self) -> List[str]:
+        """
+        Returns the lines appended since the previous poll
+        """
+        with self._lock:
+            lines = self._read()
+            try:
+                inode = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                return lines
+            if self._file is None or \
+                    inode != os.fstat(self._file.fileno()).st_ino:
+                # replaced: drain the old file, which may have been
+                # appended to after the read above, before switching
+                lines.extend(self._read())
+                generation = self._generation
+                self._open(True)
+                if self.on_gap is not None and \
+                        self._generation > generation + 1:
+                    self.on_gap()
+                lines.extend(self._read())
+            return lines
+
+    def _open(self, from_start: bool):
+        """
+        (Re)opens the file for reading, at its start or its end
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._partial = b""
+        try:
+            self._file = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        header = self._file.readline()
+        if header.startswith(b"#") and header.endswith(b"\n"):
+            self._generation = int(header[1:])
+        else:
+            self._generation = 0
+            self._file.seek(0)
+        if not from_start:
+            self._file.seek(0, os.SEEK_END)
+
+    def _read(self) -> List[str]:
+        """
+        Reads the complete lines past the current position
+        """
+        if self._file is None:
+            return []
+        data = self._partial + self._file.read()
+        end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+        return [line for line in data[:end].decode('utf-8').splitlines()
+                if not line.startswith("#")]
+
+    def _rotate(self):
+        """
+        Replaces the file with its compacted lines, lock must be held
+        """
+        with open(self.path, 'r') as f:
+            lines = f.read().splitlines()
+        generation = 0
+        if lines and lines[0].startswith("#"):
+            generation = int(lines.pop(0)[1:])
+        kept = self.compact(lines) if self.compact is not None else []
+        tmp_path = "{}.{}.tmp".format(self.path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            f.write("#{}\n".format(generation + 1))
+            f.write("".join(line + "\n" for line in kept))
+        os.replace(tmp_path, self.path)
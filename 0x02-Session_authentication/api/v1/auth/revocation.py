@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Definition of class RevocationFilter
+"""
+import hashlib
+import threading
+import time
+
+
+class RevocationFilter:
+    """
+    Bloom filter of revoked token IDs, split into two generations
+    The current generation is retired every generation_seconds, so a
+    token ID stays in the filter between one and two generations: at
+    least as long as the token can be valid if generation_seconds is
+    the token lifetime. Memory stays at two fixed-size bit arrays.
+    A false positive rejects a valid token, a few times in a million
+    with the defaults and 100k revocations per generation.
+    """
+
+    def __init__(self, generation_seconds: float, bits: int = 1 << 22,
+                 hashes: int = 7):
+        """
+        Initialize an empty filter
+        Args:
+            generation_seconds (float): Lifetime of a generation
+            bits (int): Size of each generation, in bits
+            hashes (int): Number of bits set per token ID, at most 8
+        """
+        self.generation_seconds = generation_seconds
+        self.bits = bits
+        self.hashes = hashes
+        self._lock = threading.Lock()
+        self._current = bytearray(bits // 8)
+        self._previous = bytearray(bits // 8)
+        self._rotated_at = time.monotonic()
+
+    def _positions(self, token_id: str) -> list:
+        """
+        Bit positions of a token ID
+        """
+        digest = hashlib.sha256(token_id.encode('utf-8')).digest()
+        return [int.from_bytes(digest[i * 4:i * 4 + 4], 'big') % self.bits
+                for i in range(self.hashes)]
+
+    def _rotate(self):
+        """
+        Retires the current generation if it is old enough, lock must
+        be held
+        """
+        now = time.monotonic()
+        if now - self._rotated_at < self.generation_seconds:
+            return
+        if now - self._rotated_at < 2 * self.generation_seconds:
+            self._previous = self._current
+        else:
+            self._previous = bytearray(self.bits // 8)
+        self._current = bytearray(self.bits // 8)
+        self._rotated_at = now
+
+    def add(self, token_id: str):
+        """
+        Revokes a token ID
+        """
+        positions = self._positions(token_id)
+        with self._lock:
+            self._rotate()
+            for position in positions:
+                self._current[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, token_id: str) -> bool:
+        """
+        Checks whether a token ID may have been revoked
+        """
+        positions = self._positions(token_id)
+        with self._lock:
+            self._rotate()
+            current, previous = self._current, self._previous
+        for generation in (current, previous):
+            if all(generation[position >> 3] & (1 << (position & 7))
+                   for position in positions):
+                return True
+        return False
@@ -2,16 +2,29 @@
 """
 Definition of class SessionAuth
 """
+from datetime import datetime
 from uuid import uuid4
 from typing import TypeVar
 from .auth import Auth
+from .session_store import SessionStore, ShardedSessionStore
 from models.user import User
 
 
 class SessionAuth(Auth):
     """ Implements Session Authorization protocol methods """
-    
-    user_id_by_session_id = {}
+
+    # Default store, shared by every instance not given its own
+    session_store = ShardedSessionStore()
+
+    def __init__(self, session_store: SessionStore = None):
+        """
+        Initialize the session authentication
+        Args:
+            session_store (SessionStore): Where sessions are kept, the
+              shared in-memory store if None
+        """
+        if session_store is not None:
+            self.session_store = session_store
 
     def create_session(self, user_id: str = None) -> str:
         """
@@ -25,9 +38,22 @@ class SessionAuth(Auth):
         if user_id is None or not isinstance(user_id, str):
             return None
         session_id = str(uuid4())
-        self.user_id_by_session_id[session_id] = user_id
+        self.session_store.create(session_id, self._new_record(user_id))
         return session_id
 
+    def _new_record(self, user_id: str) -> dict:
+        """
+        Builds the record of a new session
+        Args:
+            user_id (str): User's ID
+        Returns:
+            dict: the session record
+        """
+        return {
+            "user_id": user_id,
+            "created_at": datetime.now()
+        }
+
     def user_id_for_session_id(self, session_id: str = None) -> str:
         """
         Returns a user ID based on a session ID
@@ -38,7 +64,10 @@ class SessionAuth(Auth):
         """
         if session_id is None or not isinstance(session_id, str):
             return None
-        return self.user_id_by_session_id.get(session_id)
+        record = self.session_store.get(session_id)
+        if record is None:
+            return None
+        return record.get("user_id")
 
     def current_user(self, request=None) -> TypeVar('User'):
         """
@@ -48,11 +77,14 @@ class SessionAuth(Auth):
         Returns:
             User instance or None
         """
-        session_cookie = self.session_cookie(request)
-        user_id = self.user_id_for_session_id(session_cookie)
+        with self.timer.stage("session_cookie"):
+            session_cookie = self.session_cookie(request)
+        with self.timer.stage("session_lookup"):
+            user_id = self.user_id_for_session_id(session_cookie)
         if user_id is None:
             return None
-        return User.get(user_id)
+        with self.timer.stage("user_get"):
+            return User.get(user_id)
 
     def destroy_session(self, request=None) -> bool:
         """
@@ -70,5 +102,18 @@ class SessionAuth(Auth):
         user_id = self.user_id_for_session_id(session_cookie)
         if user_id is None:
             return False
-        self.user_id_by_session_id.pop(session_cookie, None)
+        self.session_store.destroy(session_cookie)
         return True
+
+    def destroy_all_sessions(self, user_id: str = None) -> int:
+        """
+        Destroys every session of a user, through the user index of the
+        session store, in time proportional to that user's sessions
+        Args:
+            user_id (str): User's ID
+        Returns:
+            int: Number of destroyed sessions
+        """
+        if user_id is None or not isinstance(user_id, str):
+            return 0
+        return len(self.session_store.destroy_user(user_id))
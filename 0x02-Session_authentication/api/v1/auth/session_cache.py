@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Definition of class CachedSessionStore
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List
+from .notify_file import NotifyFile
+from .session_store import SessionStore
+
+
+class CachedSessionStore(SessionStore):
+    """
+    In-process LRU tier in front of a persistent SessionStore
+    Unknown session IDs are cached too (negative cache), so sprayed
+    cookies stop reaching storage. Workers sharing the store keep their
+    caches coherent through an append-only notify file: every destroyed
+    or renewed session ID is appended to it, and each lookup first reads
+    the lines other workers appended since the previous one.
+    """
+
+    def __init__(self, session_store: SessionStore, max_size: int = 10000,
+                 ttl: float = 30.0, negative_ttl: float = 5.0,
+                 notify_path: str = ".db_user_sessions.notify",
+                 notify_max_bytes: int = 1 << 20):
+        """
+        Initialize an empty cache
+        Args:
+            session_store (SessionStore): The persistent store
+            max_size (int): Maximum number of cached records, and of
+              cached unknown session IDs
+            ttl (float): Seconds a record stays cached
+            negative_ttl (float): Seconds an unknown session ID stays cached
+            notify_path (str): Path of the notify file shared by workers
+            notify_max_bytes (int): Size above which the file is emptied
+        """
+        self.session_store = session_store
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        # session_id -> (record, expiry), record None for unknown IDs
+        self._entries = OrderedDict()
+        self._negatives = OrderedDict()
+        self._notify = NotifyFile(notify_path, notify_max_bytes,
+                                  on_gap=self.clear)
+
+    def create(self, session_id: str, record: dict):
+        """
+        Stores the record of a new session
+        """
+        self.session_store.create(session_id, record)
+        with self._lock:
+            self._negatives.pop(session_id, None)
+
+    def get(self, session_id: str) -> dict:
+        """
+        Returns the record of a session, or None
+        """
+        self._sync()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._negatives.get(session_id)
+            if entry is not None and entry > now:
+                self.negative_hits += 1
+                return None
+            entry = self._entries.get(session_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(session_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        record = self.session_store.get(session_id)
+        self._cache(session_id, record)
+        return record
+
+    def touch(self, session_id: str, fields: dict) -> dict:
+        """
+        Records activity on a session and tells the other workers
+        """
+        record = self.session_store.touch(session_id, fields)
+        self._publish([session_id])
+        self._cache(session_id, record)
+        return record
+
+    def destroy(self, session_id: str) -> dict:
+        """
+        Removes a session and tells the other workers
+        """
+        record = self.session_store.destroy(session_id)
+        self._publish([session_id])
+        self._cache(session_id, None)
+        return record
+
+    def destroy_user(self, user_id: str) -> List[str]:
+        """
+        Removes every session of a user and tells the other workers
+        """
+        destroyed = self.session_store.destroy_user(user_id)
+        self._publish(destroyed)
+        for session_id in destroyed:
+            self._cache(session_id, None)
+        return destroyed
+
+    def __len__(self) -> int:
+        """
+        Number of stored sessions
+        """
+        return len(self.session_store)
+
+    def stats(self) -> dict:
+        """
+        Returns the sizes and hit/miss/invalidation counters
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "negative_size": len(self._negatives),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations
+            }
+
+    def clear(self):
+        """
+        Drops every cached record and unknown session ID
+        """
+        with self._lock:
+            self._entries.clear()
+            self._negatives.clear()
+            self.invalidations += 1
+
+    def _cache(self, session_id: str, record: dict):
+        """
+        Caches the record of a session, or that it is unknown if None
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if record is None:
+                self._entries.pop(session_id, None)
+                entries = self._negatives
+                entries[session_id] = time.monotonic() + self.negative_ttl
+            else:
+                self._negatives.pop(session_id, None)
+                entries = self._entries
+                entries[session_id] = (record, time.monotonic() + self.ttl)
+            entries.move_to_end(session_id)
+            while len(entries) > self.max_size:
+                entries.popitem(last=False)
+
+    def _publish(self, session_ids: List[str]):
+        """
+        Tells the other workers that sessions changed
+        """
+        self._notify.publish(session_ids)
+
+    def _sync(self):
+        """
+        Drops the cached records of the sessions other workers changed
+        since the previous call
+        """
+        session_ids = self._notify.poll()
+        if not session_ids:
+            return
+        with self._lock:
+            for session_id in session_ids:
+                self._entries.pop(session_id, None)
+                self._negatives.pop(session_id, None)
+                self.invalidations += 1
+
+
+def cached_store_from_env(session_store: SessionStore) -> SessionStore:
+    """
+    Wraps a persistent SessionStore in a CachedSessionStore of
+    SESSION_CACHE_SIZE records, kept SESSION_CACHE_TTL seconds, unknown
+    IDs SESSION_CACHE_NEGATIVE_TTL seconds, notifying other workers
+    through SESSION_CACHE_NOTIFY_PATH; returns it as is if the size is 0
+    """
+    try:
+        max_size = int(os.getenv('SESSION_CACHE_SIZE', 0))
+        ttl = float(os.getenv('SESSION_CACHE_TTL', 30))
+        negative_ttl = float(os.getenv('SESSION_CACHE_NEGATIVE_TTL', 5))
+    except ValueError:
+        max_size, ttl, negative_ttl = 0, 30.0, 5.0
+    if max_size <= 0:
+        return session_store
+    return CachedSessionStore(
+        session_store, max_size, ttl, negative_ttl,
+        os.getenv('SESSION_CACHE_NOTIFY_PATH', ".db_user_sessions.notify"))
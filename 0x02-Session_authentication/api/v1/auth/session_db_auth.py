@@ -2,8 +2,11 @@
 """
 Define class SessionDBAuth
 """
+import time
+from datetime import datetime, timedelta
+from .session_cache import cached_store_from_env
 from .session_exp_auth import SessionExpAuth
-from models.user_session import UserSession
+from .session_store import persistent_store_from_env
 
 
 class SessionDBAuth(SessionExpAuth):
@@ -12,6 +15,21 @@ class SessionDBAuth(SessionExpAuth):
     in a database
     """
 
+    def __init__(self, session_store=None):
+        """
+        Initialize the class over a persistent session store
+        Args:
+            session_store (SessionStore): Where sessions are persisted,
+              the store selected by SESSION_DB_STORE, cached in process
+              if SESSION_CACHE_SIZE is set, if None
+        """
+        if session_store is None:
+            session_store = cached_store_from_env(
+                persistent_store_from_env())
+        super().__init__(session_store)
+        # persisted sessions outlive the process, monotonic deadlines don't
+        self.expiry = None
+
     def create_session(self, user_id=None):
         """
         Create a Session ID for a user_id
@@ -23,24 +41,41 @@ class SessionDBAuth(SessionExpAuth):
         if user_id is None:
             return None
         
-        # Generate session using parent method
-        session_id = super().create_session(user_id)
-        if not session_id:
-            return None
-        
-        # Create and save user session in database
-        kw = {
-            "user_id": user_id,
-            "session_id": session_id
-        }
+        # Generate and persist the session using parent method
         try:
-            user_session = UserSession(**kw)
-            user_session.save()
-            return session_id
+            return super().create_session(user_id)
         except Exception as e:
             # Log exception if needed
             return None
 
+    def _new_record(self, user_id):
+        """
+        Builds the record of a new session with the wall-clock time,
+        in seconds since the epoch, at which its row may be purged
+        """
+        record = super()._new_record(user_id)
+        record["expires_at"] = self._expires_at(self.session_duration)
+        return record
+
+    def _expires_at(self, remaining):
+        """
+        Seconds since the epoch at which a session expires if it stays
+        idle, given the seconds left before its absolute expiry
+        Args:
+            remaining (float): Seconds left, ignored if sessions have
+              no absolute expiry
+        Returns:
+            None if sessions never expire
+        """
+        delays = []
+        if self.session_duration > 0 and remaining is not None:
+            delays.append(remaining)
+        if self.idle_timeout > 0:
+            delays.append(self.idle_timeout)
+        if not delays:
+            return None
+        return time.time() + min(delays)
+
     def user_id_for_session_id(self, session_id=None):
         """
         Returns a user ID based on a session ID
@@ -52,14 +87,47 @@ class SessionDBAuth(SessionExpAuth):
         if session_id is None or not isinstance(session_id, str):
             return None
         try:
-            user_sessions = UserSession.search({"session_id": session_id})
-            if user_sessions:
-                return user_sessions[0].user_id
+            user_session = self.session_store.get(session_id)
+            if user_session and self._still_active(session_id, user_session):
+                return user_session["user_id"]
         except Exception as e:
             # Log exception if needed
             return None
         return None
 
+    def _still_active(self, session_id, record):
+        """
+        Checks the expiry and idle timeout of a persisted session against
+        its created_at and updated_at, and saves it again at most once
+        per renew_interval
+        Args:
+            session_id (str): Session ID
+            record (dict): Session record
+        Returns:
+            False if the session expired or idled out, True otherwise
+        """
+        now = datetime.utcnow()
+        created_at = record.get("created_at")
+        remaining = None
+        if self.session_duration > 0 and created_at is not None:
+            remaining = self.session_duration - \
+                (now - created_at).total_seconds()
+            if remaining <= 0:
+                return False
+        if self.idle_timeout <= 0:
+            return True
+        last_active = record.get("updated_at") or created_at
+        if last_active is None:
+            return True
+        idle = now - last_active
+        if idle >= timedelta(seconds=self.idle_timeout):
+            return False
+        if idle >= timedelta(seconds=self.renew_interval):
+            self.session_store.touch(session_id, {
+                "expires_at": self._expires_at(remaining)
+            })
+        return True
+
     def destroy_session(self, request=None):
         """
         Destroy a UserSession instance based on a
@@ -75,11 +143,23 @@ class SessionDBAuth(SessionExpAuth):
         if not session_id:
             return False
         try:
-            user_sessions = UserSession.search({"session_id": session_id})
-            if user_sessions:
-                user_sessions[0].remove()
+            if self.session_store.destroy(session_id) is not None:
                 return True
         except Exception as e:
             # Log exception if needed
             return False
         return False
+
+    def destroy_all_sessions(self, user_id=None):
+        """
+        Destroy every persisted session of a user
+        Args:
+            user_id (str): User's ID
+        Returns:
+            Number of destroyed sessions
+        """
+        try:
+            return super().destroy_all_sessions(user_id)
+        except Exception as e:
+            # Log exception if needed
+            return 0
@@ -3,11 +3,9 @@
 Define SessionExpAuth class
 """
 import os
-from datetime import (
-    datetime,
-    timedelta
-)
+import time
 from .session_auth import SessionAuth
+from .session_expiry import ExpiryIndex
 
 
 class SessionExpAuth(SessionAuth):
@@ -16,37 +14,91 @@ class SessionExpAuth(SessionAuth):
     expiration date to a Session ID
     """
 
-    def __init__(self):
+    def __init__(self, session_store=None):
         """
         Initialize the class with a session duration from an environment variable.
         If the environment variable is not set, defaults to 0 (no expiration).
+        With SESSION_IDLE_TIMEOUT set, sessions also expire after that many
+        seconds without activity; activity extends them at most once every
+        SESSION_RENEW_INTERVAL seconds.
+        Expired sessions are evicted every SESSION_REAP_INTERVAL seconds.
+        Args:
+            session_store (SessionStore): Where sessions are kept
         """
+        super().__init__(session_store)
         try:
             duration = int(os.getenv('SESSION_DURATION', 0))
         except ValueError:
             duration = 0
         self.session_duration = duration
+        try:
+            idle_timeout = int(os.getenv('SESSION_IDLE_TIMEOUT', 0))
+        except ValueError:
+            idle_timeout = 0
+        self.idle_timeout = idle_timeout
+        try:
+            renew_interval = int(os.getenv('SESSION_RENEW_INTERVAL', 60))
+        except ValueError:
+            renew_interval = 60
+        # a session must get a chance to be renewed before it idles out
+        if idle_timeout > 0:
+            renew_interval = min(renew_interval, idle_timeout // 2)
+        self.renew_interval = max(renew_interval, 0)
+        try:
+            reap_interval = float(os.getenv('SESSION_REAP_INTERVAL', 1.0))
+        except ValueError:
+            reap_interval = 1.0
+        self.expiry = ExpiryIndex(self.session_store, max(reap_interval, 0.01))
 
     def create_session(self, user_id=None):
         """
-        Create a Session ID for a given user ID and store session data with creation time.
+        Creates a Session ID and tracks its deadline for eviction
         Args:
-            user_id (str): User ID
+            user_id (str): User's ID
         Returns:
-            str: New session ID or None if user_id is None
+            A new session ID or None
         """
         session_id = super().create_session(user_id)
-        if session_id is None:
-            return None
-        
-        # Store user session data with creation timestamp
-        session_data = {
-            "user_id": user_id,
-            "created_at": datetime.now()
-        }
-        self.user_id_by_session_id[session_id] = session_data
+        if session_id is None or self.expiry is None:
+            return session_id
+        record = self.session_store.get(session_id)
+        if record is not None and record.get("deadline") is not None:
+            self.expiry.add(session_id, record["deadline"])
         return session_id
 
+    def _new_record(self, user_id):
+        """
+        Builds the record of a new session with its monotonic deadline,
+        in nanoseconds, or no deadline if sessions never expire
+        "expires" is the absolute deadline, "renewed" the last renewal.
+        """
+        record = super()._new_record(user_id)
+        now = time.monotonic_ns()
+        if self.session_duration > 0:
+            record["expires"] = now + self.session_duration * 1000000000
+            record["deadline"] = record["expires"]
+        if self.idle_timeout > 0:
+            record["renewed"] = now
+            record["deadline"] = min(record.get("deadline", float('inf')),
+                                     now + self.idle_timeout * 1000000000)
+        return record
+
+    def _renew(self, session_id, record, now):
+        """
+        Extends the idle deadline of an active session, unless it was
+        already renewed less than renew_interval seconds ago
+        """
+        renewed = record.get("renewed")
+        if renewed is None or \
+                now - renewed < self.renew_interval * 1000000000:
+            return
+        deadline = now + self.idle_timeout * 1000000000
+        expires = record.get("expires")
+        if expires is not None:
+            deadline = min(deadline, expires)
+        self.session_store.touch(session_id, {"deadline": deadline,
+                                              "renewed": now})
+
     def user_id_for_session_id(self, session_id=None):
         """
         Returns a user ID based on a session ID if the session is still valid.
@@ -57,22 +109,25 @@ class SessionExpAuth(SessionAuth):
         """
         if session_id is None or not isinstance(session_id, str):
             return None
-        
-        # Retrieve session data
-        user_details = self.user_id_by_session_id.get(session_id)
-        if user_details is None:
+
+        record = self.session_store.get(session_id)
+        if record is None:
             return None
 
-        # Check if the session has expired
-        created_at = user_details.get("created_at")
-        if created_at is None:
+        # The reaper may not have evicted an expired session yet
+        now = time.monotonic_ns()
+        deadline = record.get("deadline")
+        if deadline is not None and now >= deadline:
             return None
-        if self.session_duration <= 0:
-            return user_details.get("user_id")
+        if self.idle_timeout > 0:
+            self._renew(session_id, record, now)
 
-        # Verify if the session is still within the allowed window
-        expiration_time = created_at + timedelta(seconds=self.session_duration)
-        if datetime.now() > expiration_time:
-            return None  # Session has expired
+        return record.get("user_id")
 
-        return user_details.get("user_id")
+    def session_gauges(self) -> dict:
+        """
+        Returns the number of live and expired sessions held in memory
+        """
+        if self.expiry is None:
+            return {"live_sessions": len(self.session_store)}
+        return self.expiry.gauges()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Definition of class ExpiryIndex
+"""
+import heapq
+import threading
+import time
+from .session_store import SessionStore
+
+
+class ExpiryIndex:
+    """
+    Min-heap of (deadline, session ID) used to evict expired sessions
+    from a SessionStore in batches, from a background reaper thread.
+    Deadlines are time.monotonic_ns() integers. When the record of a
+    session carries a later "deadline" than its heap entry (the session
+    was renewed), the session is pushed back instead of evicted.
+    """
+
+    def __init__(self, session_store: SessionStore,
+                 reap_interval: float = 1.0):
+        """
+        Initialize an empty index
+        Args:
+            session_store (SessionStore): Store to evict sessions from
+            reap_interval (float): Seconds between two reaper passes
+        """
+        self.session_store = session_store
+        self.reap_interval = reap_interval
+        self.reaped = 0
+        self._heap = []
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def add(self, session_id: str, deadline: int):
+        """
+        Tracks the deadline of a session and starts the reaper if needed
+        """
+        with self._lock:
+            heapq.heappush(self._heap, (deadline, session_id))
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._run,
+                                                daemon=True,
+                                                name="session-reaper")
+                self._reaper.start()
+
+    def reap(self, now: int = None) -> int:
+        """
+        Evicts every session whose deadline has passed
+        Args:
+            now (int): time.monotonic_ns() to compare deadlines with
+        Returns:
+            int: number of sessions evicted
+        """
+        if now is None:
+            now = time.monotonic_ns()
+        expired = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                expired.append(heapq.heappop(self._heap))
+        evicted = 0
+        for _, session_id in expired:
+            record = self.session_store.get(session_id)
+            if record is None:
+                continue  # already destroyed
+            deadline = record.get("deadline")
+            if deadline is not None and deadline > now:
+                with self._lock:
+                    heapq.heappush(self._heap, (deadline, session_id))
+                continue
+            if self.session_store.destroy(session_id) is not None:
+                evicted += 1
+        with self._lock:
+            self.reaped += evicted
+        return evicted
+
+    def gauges(self) -> dict:
+        """
+        Returns the number of live sessions, of expired sessions not
+        evicted yet, of tracked deadlines and of sessions evicted so far
+        Heap entries past their deadline are checked against the store,
+        as the session may since have been destroyed or renewed.
+        """
+        now = time.monotonic_ns()
+        with self._lock:
+            tracked = len(self._heap)
+            reaped = self.reaped
+            due = self._due(now)
+        expired = 0
+        for session_id in due:
+            record = self.session_store.get(session_id)
+            if record is not None and record.get("deadline", now) <= now:
+                expired += 1
+        return {
+            "live_sessions": max(len(self.session_store) - expired, 0),
+            "expired_sessions": expired,
+            "tracked_deadlines": tracked,
+            "reaped_sessions": reaped
+        }
+
+    def _due(self, now: int) -> list:
+        """
+        Session IDs of the heap entries whose deadline has passed,
+        without visiting the others, lock must be held
+        """
+        due = []
+        pending = [0] if self._heap else []
+        while pending:
+            i = pending.pop()
+            deadline, session_id = self._heap[i]
+            if deadline > now:
+                continue  # so is every entry below it
+            due.append(session_id)
+            pending.extend(child for child in (2 * i + 1, 2 * i + 2)
+                           if child < len(self._heap))
+        return due
+
+    def _run(self):
+        """
+        Reaper loop
+        """
+        while True:
+            time.sleep(self.reap_interval)
+            self.reap()
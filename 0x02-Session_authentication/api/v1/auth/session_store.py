@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Definition of the session stores used by SessionAuth and its subclasses
+"""
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List
+from models.user_session import UserSession
+
+
+class SessionStore(ABC):
+    """
+    Keeps session records by session ID
+    A record is a dict holding at least the "user_id" of the session.
+    Backends must implement every method, or they cannot be built.
+    """
+
+    @abstractmethod
+    def create(self, session_id: str, record: dict):
+        """
+        Stores the record of a new session
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, session_id: str) -> dict:
+        """
+        Returns the record of a session, or None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def touch(self, session_id: str, fields: dict) -> dict:
+        """
+        Records activity on a session, merging fields into its record
+        Returns the updated record, or None if there is no such session
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def destroy(self, session_id: str) -> dict:
+        """
+        Removes a session and returns its record, or None if there was none
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def destroy_user(self, user_id: str) -> List[str]:
+        """
+        Removes every session of a user and returns their session IDs
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        Number of stored sessions
+        """
+        raise NotImplementedError
+
+
+class ShardedSessionStore(SessionStore):
+    """
+    In-memory SessionStore split into shards, each behind its own lock,
+    so threads working on different sessions rarely wait on each other.
+    A user -> session IDs index, striped the same way, makes destroy_user
+    proportional to the number of sessions of that user.
+    Lock order is always user stripe, then session shard.
+    """
+
+    def __init__(self, shards: int = 16):
+        """
+        Initialize an empty store
+        Args:
+            shards (int): number of shards and of user index stripes
+        """
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+        self._users = [({}, threading.Lock()) for _ in range(shards)]
+
+    def _shard(self, session_id: str) -> tuple:
+        """
+        Records and lock of the shard holding a session
+        """
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def _stripe(self, user_id: str) -> tuple:
+        """
+        Index and lock of the stripe holding the sessions of a user
+        """
+        return self._users[hash(user_id) % len(self._users)]
+
+    def create(self, session_id: str, record: dict):
+        """
+        Stores the record of a new session
+        """
+        user_sessions, user_lock = self._stripe(record["user_id"])
+        records, lock = self._shard(session_id)
+        with user_lock:
+            with lock:
+                records[session_id] = record
+            user_sessions.setdefault(record["user_id"], set()).add(session_id)
+
+    def get(self, session_id: str) -> dict:
+        """
+        Returns the record of a session, or None
+        """
+        records, _ = self._shard(session_id)
+        # a single dict lookup is atomic, no lock needed to read
+        return records.get(session_id)
+
+    def touch(self, session_id: str, fields: dict) -> dict:
+        """
+        Records activity on a session, merging fields into its record
+        Records are replaced, never mutated, so lock-free readers always
+        see a consistent record.
+        """
+        records, lock = self._shard(session_id)
+        with lock:
+            record = records.get(session_id)
+            if record is None:
+                return None
+            record = dict(record, **fields)
+            records[session_id] = record
+        return record
+
+    def destroy(self, session_id: str) -> dict:
+        """
+        Removes a session and returns its record, or None if there was none
+        """
+        records, lock = self._shard(session_id)
+        with lock:
+            record = records.pop(session_id, None)
+        if record is None:
+            return None
+        user_sessions, user_lock = self._stripe(record["user_id"])
+        with user_lock:
+            session_ids = user_sessions.get(record["user_id"])
+            if session_ids is not None:
+                session_ids.discard(session_id)
+                if not session_ids:
+                    del user_sessions[record["user_id"]]
+        return record
+
+    def destroy_user(self, user_id: str) -> List[str]:
+        """
+        Removes every session of a user and returns their session IDs
+        """
+        user_sessions, user_lock = self._stripe(user_id)
+        destroyed = []
+        with user_lock:
+            for session_id in user_sessions.pop(user_id, ()):
+                records, lock = self._shard(session_id)
+                with lock:
+                    if records.pop(session_id, None) is not None:
+                        destroyed.append(session_id)
+        return destroyed
+
+    def __len__(self) -> int:
+        """
+        Number of stored sessions
+        """
+        return sum(len(records) for records, _ in self._shards)
+
+
+class UserSessionStore(SessionStore):
+    """
+    SessionStore persisting each session as a UserSession object
+    Lookups go through the session_id and user_id indexes of UserSession.
+    """
+
+    def create(self, session_id: str, record: dict):
+        """
+        Saves a UserSession for a new session
+        """
+        user_session = UserSession(user_id=record["user_id"],
+                                   session_id=session_id)
+        user_session.save()
+
+    def get(self, session_id: str) -> dict:
+        """
+        Returns the record of a session, or None
+        """
+        user_sessions = UserSession.search({"session_id": session_id})
+        if not user_sessions:
+            return None
+        return self._record(user_sessions[0])
+
+    def touch(self, session_id: str, fields: dict) -> dict:
+        """
+        Records activity on a session by saving its UserSession again,
+        which moves its updated_at; other fields are not persisted
+        """
+        user_sessions = UserSession.search({"session_id": session_id})
+        if not user_sessions:
+            return None
+        user_sessions[0].save()
+        return self._record(user_sessions[0])
+
+    def destroy(self, session_id: str) -> dict:
+        """
+        Removes a session and returns its record, or None if there was none
+        """
+        user_sessions = UserSession.search({"session_id": session_id})
+        if not user_sessions:
+            return None
+        for user_session in user_sessions:
+            user_session.remove()
+        return self._record(user_sessions[0])
+
+    def destroy_user(self, user_id: str) -> List[str]:
+        """
+        Removes every session of a user and returns their session IDs
+        """
+        destroyed = []
+        for user_session in UserSession.search({"user_id": user_id}):
+            user_session.remove()
+            destroyed.append(user_session.session_id)
+        return destroyed
+
+    def __len__(self) -> int:
+        """
+        Number of stored sessions
+        """
+        return UserSession.count()
+
+    @staticmethod
+    def _record(user_session) -> dict:
+        """
+        Session record of a UserSession
+        """
+        return {
+            "user_id": user_session.user_id,
+            "created_at": user_session.created_at,
+            "updated_at": user_session.updated_at
+        }
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SessionStore persisting sessions in a SQLite table, in WAL mode
+    Each session is one row keyed by session_id, so a login writes one
+    row instead of rewriting every session, and lookups use the primary
+    key. Each thread gets its own connection. Rows whose "expires_at"
+    (seconds since the epoch, from the record) has passed are purged on
+    startup and every purge_interval seconds.
+    """
+
+    def __init__(self, db_path: str = ".db_user_sessions.sqlite3",
+                 purge_interval: float = 300.0):
+        """
+        Open the database, create the table if needed and purge it
+        Args:
+            db_path (str): Path of the SQLite database file
+            purge_interval (float): Seconds between two purges, 0 disables
+              periodic purges
+        """
+        self.db_path = db_path
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS user_sessions (
+                session_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                expires_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS ix_user_sessions_user_id
+                ON user_sessions (user_id);
+            CREATE INDEX IF NOT EXISTS ix_user_sessions_expires_at
+                ON user_sessions (expires_at);
+        """)
+        self.purge_expired()
+        if purge_interval > 0:
+            threading.Thread(target=self._run, daemon=True,
+                             name="session-purger").start()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Connection of the current thread, opened on first use
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=10,
+                                         isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Runs the block in a write transaction on the thread's connection
+        """
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def create(self, session_id: str, record: dict):
+        """
+        Inserts the row of a new session
+        """
+        now = time.time()
+        self._connection().execute(
+            "INSERT INTO user_sessions VALUES (?, ?, ?, ?, ?)",
+            (session_id, record["user_id"], now, now,
+             record.get("expires_at")))
+
+    def get(self, session_id: str) -> dict:
+        """
+        Returns the record of a session, or None
+        """
+        row = self._connection().execute(
+            "SELECT user_id, created_at, updated_at, expires_at"
+            " FROM user_sessions WHERE session_id = ?",
+            (session_id,)).fetchone()
+        return None if row is None else self._record(row)
+
+    def touch(self, session_id: str, fields: dict) -> dict:
+        """
+        Records activity on a session: moves its updated_at and, if given
+        in fields, its expires_at
+        """
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE user_sessions SET updated_at = ?,"
+                " expires_at = COALESCE(?, expires_at)"
+                " WHERE session_id = ?",
+                (time.time(), fields.get("expires_at"), session_id))
+            return self.get(session_id)
+
+    def destroy(self, session_id: str) -> dict:
+        """
+        Removes a session and returns its record, or None if there was none
+        """
+        with self._transaction() as connection:
+            record = self.get(session_id)
+            if record is not None:
+                connection.execute(
+                    "DELETE FROM user_sessions WHERE session_id = ?",
+                    (session_id,))
+            return record
+
+    def destroy_user(self, user_id: str) -> List[str]:
+        """
+        Removes every session of a user and returns their session IDs
+        """
+        with self._transaction() as connection:
+            destroyed = [row[0] for row in connection.execute(
+                "SELECT session_id FROM user_sessions WHERE user_id = ?",
+                (user_id,))]
+            connection.execute(
+                "DELETE FROM user_sessions WHERE user_id = ?", (user_id,))
+            return destroyed
+
+    def purge_expired(self, now: float = None) -> int:
+        """
+        Deletes the rows of expired sessions
+        Args:
+            now (float): seconds since the epoch, the current time if None
+        Returns:
+            int: number of deleted rows
+        """
+        if now is None:
+            now = time.time()
+        cursor = self._connection().execute(
+            "DELETE FROM user_sessions"
+            " WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        """
+        Number of stored sessions
+        """
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM user_sessions").fetchone()[0]
+
+    def _run(self):
+        """
+        Purger loop
+        """
+        while True:
+            time.sleep(self.purge_interval)
+            try:
+                self.purge_expired()
+            except sqlite3.Error:
+                pass  # database busy, retry on the next pass
+
+    @staticmethod
+    def _record(row: tuple) -> dict:
+        """
+        Session record of a row, timestamps as naive UTC datetimes
+        like those of UserSession
+        """
+        user_id, created_at, updated_at, expires_at = row
+        return {
+            "user_id": user_id,
+            "created_at": datetime.utcfromtimestamp(created_at),
+            "updated_at": datetime.utcfromtimestamp(updated_at),
+            "expires_at": expires_at
+        }
+
+
+def persistent_store_from_env() -> SessionStore:
+    """
+    Returns the persistent SessionStore selected by SESSION_DB_STORE:
+    "user_session" for UserSession objects, a SQLite table otherwise,
+    at SESSION_DB_PATH and purged every SESSION_PURGE_INTERVAL seconds
+    """
+    if os.getenv("SESSION_DB_STORE") == "user_session":
+        return UserSessionStore()
+    try:
+        purge_interval = float(os.getenv("SESSION_PURGE_INTERVAL", 300))
+    except ValueError:
+        purge_interval = 300.0
+    return SQLiteSessionStore(
+        os.getenv("SESSION_DB_PATH", ".db_user_sessions.sqlite3"),
+        purge_interval)
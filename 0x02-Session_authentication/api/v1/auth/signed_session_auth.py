@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Definition of class SignedSessionAuth
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from uuid import uuid4
+from typing import List, TypeVar
+from .auth import Auth
+from .notify_file import NotifyFile
+from .revocation import RevocationFilter
+from models.user import User
+
+
+def _b64encode(data: bytes) -> str:
+    """
+    Unpadded base64url encoding
+    """
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode('ascii')
+
+
+def _b64decode(data: str) -> bytes:
+    """
+    Decodes unpadded base64url
+    """
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class SignedSessionAuth(Auth):
+    """
+    Session authentication with self-contained session cookies
+    A session ID is a token "<payload>.<signature>": the base64url JSON
+    payload {"uid", "iat", "exp", "jti"} signed with HMAC-SHA256 under
+    SESSION_SECRET, "iat" in nanoseconds and "exp" in milliseconds since
+    the epoch. Validating it needs no session store: only a
+    revocation filter of logged out token IDs and the revocation epoch
+    of the user, both in memory. Workers given a SESSION_REVOCATION_PATH
+    share revocations through that file.
+    """
+
+    def __init__(self, secret: bytes = None):
+        """
+        Initialize the class from environment variables
+        SESSION_SECRET signs tokens; without it tokens are signed with a
+        random per-process key and only valid in this process.
+        SESSION_DURATION is the token lifetime, one day if unset or 0.
+        Args:
+            secret (bytes): Signing key, SESSION_SECRET if None
+        """
+        if secret is None:
+            secret = os.getenv('SESSION_SECRET', '').encode('utf-8') or \
+                os.urandom(32)
+        self._secret = secret
+        try:
+            duration = int(os.getenv('SESSION_DURATION', 0))
+        except ValueError:
+            duration = 0
+        self.session_duration = duration if duration > 0 else 86400
+        self.revoked = RevocationFilter(self.session_duration)
+        self._lock = threading.Lock()
+        # user_id -> tokens issued up to this time (ns) are revoked
+        self._epochs = {}
+        revocation_path = os.getenv('SESSION_REVOCATION_PATH')
+        self._notify = None
+        if revocation_path:
+            self._notify = NotifyFile(revocation_path,
+                                      compact=self._live_revocations,
+                                      from_start=True)
+            self._sync()
+
+    def _sign(self, payload: str) -> str:
+        """
+        Signature of an encoded payload
+        """
+        return _b64encode(hmac.new(self._secret, payload.encode('ascii'),
+                                   hashlib.sha256).digest())
+
+    def create_session(self, user_id: str = None) -> str:
+        """
+        Issues a signed session token for a user with user_id
+        Args:
+            user_id (str): User's ID
+        Returns:
+            None if user_id is None or not a string, otherwise the token
+        """
+        if user_id is None or not isinstance(user_id, str):
+            return None
+        # later than the revocation epoch even if the clock is coarse
+        issued = max(time.time_ns(), self._epochs.get(user_id, -1) + 1)
+        now = issued // 1000000
+        payload = _b64encode(json.dumps({
+            "uid": user_id,
+            "iat": issued,
+            "exp": now + self.session_duration * 1000,
+            "jti": uuid4().hex
+        }, separators=(',', ':')).encode('utf-8'))
+        return "{}.{}".format(payload, self._sign(payload))
+
+    def _claims(self, token: str) -> dict:
+        """
+        Returns the payload of a token with a valid signature that has
+        not expired, or None
+        """
+        if token is None or not isinstance(token, str):
+            return None
+        payload, _, signature = token.partition(".")
+        try:
+            if not hmac.compare_digest(signature.encode('ascii'),
+                                       self._sign(payload).encode('ascii')):
+                return None
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            return None
+        if not isinstance(claims, dict) or \
+                claims.get("exp", 0) <= time.time_ns() // 1000000:
+            return None
+        return claims
+
+    def _is_revoked(self, claims: dict) -> bool:
+        """
+        Checks whether the token of a payload was revoked
+        """
+        self._sync()
+        if claims.get("iat", 0) <= self._epochs.get(claims.get("uid"), -1):
+            return True
+        return claims.get("jti", "") in self.revoked
+
+    def user_id_for_session_id(self, session_id: str = None) -> str:
+        """
+        Returns the user ID of a valid session token
+        Args:
+            session_id (str): Session token
+        Returns:
+            User ID or None if the token is invalid, expired or revoked
+        """
+        claims = self._claims(session_id)
+        if claims is None or self._is_revoked(claims):
+            return None
+        return claims.get("uid")
+
+    def current_user(self, request=None) -> TypeVar('User'):
+        """
+        Returns a User instance based on a cookie value
+        Args:
+            request: Request object containing the session cookie
+        Returns:
+            User instance or None
+        """
+        with self.timer.stage("session_cookie"):
+            session_cookie = self.session_cookie(request)
+        with self.timer.stage("token_verify"):
+            user_id = self.user_id_for_session_id(session_cookie)
+        if user_id is None:
+            return None
+        with self.timer.stage("user_get"):
+            return User.get(user_id)
+
+    def destroy_session(self, request=None) -> bool:
+        """
+        Revokes the session token of a request
+        Args:
+            request: Request object
+        Returns:
+            True if a valid token was revoked, False otherwise
+        """
+        if request is None:
+            return False
+        claims = self._claims(self.session_cookie(request))
+        if claims is None or self._is_revoked(claims):
+            return False
+        self.revoked.add(claims["jti"])
+        self._publish("jti {} {}".format(claims["jti"], claims["exp"]))
+        return True
+
+    def revoke_user(self, user_id: str) -> int:
+        """
+        Revokes every token issued to a user up to now; tokens issued
+        after, such as a login right after, stay valid
+        Args:
+            user_id (str): User's ID
+        Returns:
+            int: the new revocation epoch of the user, in nanoseconds
+        """
+        epoch = time.time_ns()
+        self._set_epoch(user_id, epoch)
+        self._publish("user {} {}".format(user_id, epoch))
+        return epoch
+
+    def destroy_all_sessions(self, user_id: str = None) -> int:
+        """
+        Revokes every token issued so far to a user through its epoch
+        Args:
+            user_id (str): User's ID
+        Returns:
+            int: 0, tokens are not tracked so they cannot be counted
+        """
+        if user_id is None or not isinstance(user_id, str):
+            return 0
+        self.revoke_user(user_id)
+        return 0
+
+    def _set_epoch(self, user_id: str, epoch: int):
+        """
+        Moves the revocation epoch of a user forward
+        """
+        with self._lock:
+            if epoch > self._epochs.get(user_id, -1):
+                self._epochs[user_id] = epoch
+
+    def _publish(self, line: str):
+        """
+        Shares a revocation with the other workers
+        """
+        if self._notify is not None:
+            self._notify.publish([line])
+
+    def _sync(self):
+        """
+        Applies the revocations other workers shared since the last call
+        """
+        if self._notify is None:
+            return
+        for line in self._notify.poll():
+            try:
+                kind, key, value = line.split(" ")
+            except ValueError:
+                continue
+            if kind == "jti":
+                self.revoked.add(key)
+            elif value.isdigit():
+                self._set_epoch(key, int(value))
+
+    def _live_revocations(self, lines: List[str]) -> List[str]:
+        """
+        Revocations worth keeping when the revocation file is compacted:
+        those of tokens that have not expired, and the latest epoch of
+        each user if recent enough to matter
+        """
+        now = time.time_ns() // 1000000
+        oldest = (now - self.session_duration * 1000) * 1000000
+        kept = []
+        epochs = {}
+        for line in lines:
+            try:
+                kind, key, value = line.split(" ")
+                value = int(value)
+            except ValueError:
+                continue
+            if kind == "jti":
+                if value > now:
+                    kept.append(line)
+            elif value > oldest and value > epochs.get(key, -1):
+                epochs[key] = value
+        kept.extend("user {} {}".format(user_id, epoch)
+                    for user_id, epoch in epochs.items())
+        return kept
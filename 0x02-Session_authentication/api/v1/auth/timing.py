@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Definition of class StageTimer
+"""
+import threading
+import time
+from contextlib import contextmanager
+from flask import has_request_context, request
+
+
+class StageTimer:
+    """
+    Accumulates the time spent in each authentication stage, per endpoint
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty set of counters
+        """
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Times the body of a with block as stage `name` of the current endpoint
+        Args:
+            name (str): Name of the stage
+        """
+        started = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - started)
+
+    def record(self, name: str, elapsed_ns: int):
+        """
+        Adds a duration to stage `name` of the current endpoint, or of
+        "<unmatched>" for requests that matched no route
+        Args:
+            name (str): Name of the stage
+            elapsed_ns (int): Duration in nanoseconds
+        """
+        endpoint = "-"
+        if has_request_context():
+            # unmatched paths are client-controlled: one bucket for all
+            endpoint = request.endpoint or "<unmatched>"
+        with self._lock:
+            stages = self._counters.setdefault(endpoint, {})
+            counter = stages.setdefault(name, [0, 0])
+            counter[0] += 1
+            counter[1] += elapsed_ns
+
+    def snapshot(self) -> dict:
+        """
+        Returns the counters as {endpoint: {stage: {count, total_ms, avg_ms}}}
+        """
+        with self._lock:
+            counters = {endpoint: {name: tuple(counter)
+                                   for name, counter in stages.items()}
+                        for endpoint, stages in self._counters.items()}
+        result = {}
+        for endpoint, stages in counters.items():
+            result[endpoint] = {}
+            for name, (count, total_ns) in stages.items():
+                result[endpoint][name] = {
+                    "count": count,
+                    "total_ms": total_ns / 1e6,
+                    "avg_ms": total_ns / 1e6 / count
+                }
+        return result
+
+    def reset(self):
+        """
+        Clears every counter
+        """
+        with self._lock:
+            self._counters = {}
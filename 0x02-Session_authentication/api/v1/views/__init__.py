@@ -9,4 +9,7 @@ from api.v1.views.index import *
 from api.v1.views.users import *
 from api.v1.views.session_auth import *
 
+from models.user_session import UserSession
+
 User.load_from_file()
+UserSession.load_from_file()
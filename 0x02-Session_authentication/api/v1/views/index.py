@@ -4,33 +4,37 @@
 from flask import jsonify, abort
 from api.v1.views import app_views
 
+
 @app_views.route('/unauthorized', methods=['GET'], strict_slashes=False)
 def handle_unauthorized() -> str:
-    """ 
+    """
     GET /api/v1/unauthorized endpoint
     Raises a 401 Unauthorized error
     """
     abort(401, description="Unauthorized")
 
+
 @app_views.route('/forbidden', methods=['GET'], strict_slashes=False)
 def handle_forbidden() -> str:
-    """ 
+    """
     GET /api/v1/forbidden endpoint
     Raises a 403 Forbidden error
     """
     abort(403, description="Forbidden")
 
+
 @app_views.route('/status', methods=['GET'], strict_slashes=False)
 def api_status() -> str:
-    """ 
+    """
     GET /api/v1/status endpoint
     Returns the status of the API
     """
     return jsonify({"status": "OK"})
 
+
 @app_views.route('/stats/', strict_slashes=False)
 def get_object_statistics() -> str:
-    """ 
+    """
     GET /api/v1/stats endpoint
     Returns:
         - the count of each type of object
@@ -39,3 +43,41 @@ def get_object_statistics() -> str:
     object_counts = {}
     object_counts['users'] = User.count()
     return jsonify(object_counts)
+
+
+@app_views.route('/stats/auth', methods=['GET'], strict_slashes=False)
+def get_auth_statistics() -> str:
+    """
+    GET /api/v1/stats/auth endpoint
+    Returns:
+        - time spent in each authentication stage, per endpoint
+    """
+    from api.v1.auth.auth import Auth
+    return jsonify(Auth.timer.snapshot())
+
+
+@app_views.route('/stats/credentials', methods=['GET'],
+                 strict_slashes=False)
+def get_credential_statistics() -> str:
+    """
+    GET /api/v1/stats/credentials endpoint
+    Returns:
+        - the size and hit/miss counters of the Basic auth credential cache
+    """
+    from api.v1.app import authentication
+    if not hasattr(authentication, 'credential_cache'):
+        abort(404)
+    return jsonify(authentication.credential_cache.stats())
+
+
+@app_views.route('/stats/sessions', methods=['GET'], strict_slashes=False)
+def get_session_statistics() -> str:
+    """
+    GET /api/v1/stats/sessions endpoint
+    Returns:
+        - the number of live and expired sessions, if sessions expire
+    """
+    from api.v1.app import authentication
+    if not hasattr(authentication, 'session_gauges'):
+        abort(404)
+    return jsonify(authentication.session_gauges())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of Auth.require_auth with a PathMatcher built once against
+the previous loop over the excluded paths
+"""
+import sys
+import timeit
+from typing import List
+
+from api.v1.auth.auth import Auth, PathMatcher
+
+
+def loop_require_auth(path: str, excluded_paths: List[str]) -> bool:
+    """ The previous implementation: one rstrip and comparison per path """
+    if not path:
+        return True
+    if not excluded_paths:
+        return True
+    path = path.rstrip('/')
+    for excluded_path in excluded_paths:
+        normalized_excluded = excluded_path.rstrip('/')
+        if normalized_excluded.endswith('*'):
+            if path.startswith(normalized_excluded[:-1]):
+                return False
+        elif path == normalized_excluded:
+            return False
+    return True
+
+
+def main():
+    """ Prints lookups/sec for each implementation and route count """
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    auth = Auth()
+    paths = ['/api/v1/users/me', '/api/v1/public/17/', '/api/v1/status']
+    for routes in (4, 100, 500):
+        excluded_paths = ['/api/v1/status/']
+        excluded_paths += ['/api/v1/open{}/'.format(i)
+                           for i in range(routes // 2)]
+        excluded_paths += ['/api/v1/pub{}/*'.format(i)
+                           for i in range(routes - len(excluded_paths))]
+        matcher = PathMatcher(excluded_paths)
+        for path in paths:
+            assert auth.require_auth(path, matcher) == \
+                loop_require_auth(path, excluded_paths)
+
+        print("{} excluded paths:".format(len(excluded_paths)))
+        candidates = {
+            "loop": lambda: [loop_require_auth(path, excluded_paths)
+                             for path in paths],
+            "PathMatcher": lambda: [auth.require_auth(path, matcher)
+                                    for path in paths],
+        }
+        for name, func in candidates.items():
+            seconds = min(timeit.repeat(func, number=number, repeat=3))
+            print("  {:<12} {:>12,.0f} lookups/sec".format(
+                name, number * len(paths) / seconds))
+
+
+if __name__ == "__main__":
+    main()
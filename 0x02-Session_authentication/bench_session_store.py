@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Multi-threaded throughput benchmark of ShardedSessionStore
+Each thread creates, looks up and destroys sessions; a store with a
+single shard stands for the previous single dict behind one lock.
+"""
+import sys
+import threading
+import time
+from uuid import uuid4
+
+from api.v1.auth.session_store import ShardedSessionStore
+
+
+def worker(store: ShardedSessionStore, operations: int, barrier):
+    """ create / 8 lookups / destroy cycles until operations are done """
+    session_ids = [str(uuid4()) for _ in range(operations // 10)]
+    user_id = str(uuid4())
+    barrier.wait()
+    for session_id in session_ids:
+        store.create(session_id, {"user_id": user_id})
+        for _ in range(8):
+            store.get(session_id)
+        store.destroy(session_id)
+
+
+def run(shards: int, threads: int, operations: int) -> float:
+    """ Returns operations/sec with `threads` threads """
+    store = ShardedSessionStore(shards)
+    barrier = threading.Barrier(threads + 1)
+    pool = [threading.Thread(target=worker,
+                             args=(store, operations, barrier))
+            for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    return threads * operations / (time.perf_counter() - started)
+
+
+def main():
+    """ Prints operations/sec by thread count for 1 and 16 shards """
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    for threads in (1, 2, 4, 8):
+        for shards in (1, 16):
+            print("{} threads, {:>2} shards: {:>12,.0f} ops/sec".format(
+                threads, shards, run(shards, threads, operations)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+""" Base module
+"""
+from datetime import datetime
+from typing import TypeVar, List, Iterable
+import uuid
+
+from models.storage import storage_from_env
+
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+DATA = {}
+INDEXES = {}
+INDEXED_VALUES = {}
+LISTENERS = {}
+STORAGE = storage_from_env()
+
+
+class Base():
+    """ Base class
+
+    Subclasses list in `_indexes` the attributes `search()` can look up
+    through a hash index instead of scanning every object
+    """
+    _indexes = ()
+
+    def __init__(self, *args: list, **kwargs: dict):
+        """ Initialize a Base instance
+        """
+        s_class = str(self.__class__.__name__)
+        if DATA.get(s_class) is None:
+            DATA[s_class] = {}
+
+        self.id = kwargs.get('id', str(uuid.uuid4()))
+        if kwargs.get('created_at') is not None:
+            self.created_at = datetime.strptime(kwargs.get('created_at'),
+                                                TIMESTAMP_FORMAT)
+        else:
+            self.created_at = datetime.utcnow()
+        if kwargs.get('updated_at') is not None:
+            self.updated_at = datetime.strptime(kwargs.get('updated_at'),
+                                                TIMESTAMP_FORMAT)
+        else:
+            self.updated_at = datetime.utcnow()
+
+    def __eq__(self, other: TypeVar('Base')) -> bool:
+        """ Equality
+        """
+        if type(self) != type(other):
+            return False
+        if not isinstance(self, Base):
+            return False
+        return (self.id == other.id)
+
+    def to_json(self, for_serialization: bool = False) -> dict:
+        """ Convert the object a JSON dictionary
+        """
+        result = {}
+        for key, value in self.__dict__.items():
+            if not for_serialization and key[0] == '_':
+                continue
+            if type(value) is datetime:
+                result[key] = value.strftime(TIMESTAMP_FORMAT)
+            else:
+                result[key] = value
+        return result
+
+    @classmethod
+    def load_from_file(cls):
+        """ Load all objects from file
+        """
+        s_class = cls.__name__
+        DATA[s_class] = {}
+        INDEXES[s_class] = {}
+        INDEXED_VALUES[s_class] = {}
+        objs_json = STORAGE.load(s_class)
+        for obj_id, obj_json in objs_json.items():
+            obj = cls(**obj_json)
+            DATA[s_class][obj_id] = obj
+            obj._index()
+
+    @classmethod
+    def save_to_file(cls):
+        """ Save all objects to file
+        """
+        STORAGE.dump(cls.__name__, cls._objs_json())
+
+    @classmethod
+    def _objs_json(cls) -> dict:
+        """ Serialize all objects, by ID
+        """
+        s_class = cls.__name__
+        objs_json = {}
+        for obj_id, obj in DATA[s_class].items():
+            objs_json[obj_id] = obj.to_json(True)
+        return objs_json
+
+    def save(self):
+        """ Save current object
+        """
+        s_class = self.__class__.__name__
+        self.updated_at = datetime.utcnow()
+        DATA[s_class][self.id] = self
+        self._index()
+        STORAGE.write(s_class, self.id, self.to_json(True),
+                      self.__class__._objs_json)
+        self._notify("save")
+
+    def remove(self):
+        """ Remove object
+        """
+        s_class = self.__class__.__name__
+        if DATA[s_class].get(self.id) is not None:
+            del DATA[s_class][self.id]
+            self._unindex()
+            STORAGE.delete(s_class, self.id, self.__class__._objs_json)
+            self._notify("remove")
+
+    @classmethod
+    def subscribe(cls, callback: callable):
+        """ Call callback(obj, event) after an object of this class is
+        saved (event "save") or removed (event "remove")
+        """
+        LISTENERS.setdefault(cls.__name__, []).append(callback)
+
+    @classmethod
+    def unsubscribe(cls, callback: callable):
+        """ Stop calling a callback registered with subscribe()
+        """
+        callbacks = LISTENERS.get(cls.__name__, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def _notify(self, event: str):
+        """ Call the listeners of this class
+        """
+        for callback in LISTENERS.get(self.__class__.__name__, ()):
+            callback(self, event)
+
+    def _index(self):
+        """ Add the current values of the indexed attributes to the indexes
+        """
+        if not self._indexes:
+            return
+        s_class = self.__class__.__name__
+        self._unindex()
+        indexes = INDEXES.setdefault(s_class, {})
+        values = {}
+        for attribute in self._indexes:
+            value = getattr(self, attribute, None)
+            try:
+                bucket = indexes.setdefault(attribute, {}).setdefault(value,
+                                                                      {})
+            except TypeError:
+                # unhashable values are only found by a full scan
+                continue
+            bucket[self.id] = self
+            values[attribute] = value
+        INDEXED_VALUES.setdefault(s_class, {})[self.id] = values
+
+    def _unindex(self):
+        """ Remove the last indexed values of this object from the indexes
+        """
+        s_class = self.__class__.__name__
+        values = INDEXED_VALUES.get(s_class, {}).pop(self.id, None)
+        if values is None:
+            return
+        indexes = INDEXES[s_class]
+        for attribute, value in values.items():
+            bucket = indexes[attribute].get(value)
+            if bucket is None:
+                continue
+            bucket.pop(self.id, None)
+            if len(bucket) == 0:
+                del indexes[attribute][value]
+
+    @classmethod
+    def count(cls) -> int:
+        """ Count all objects
+        """
+        s_class = cls.__name__
+        return len(DATA[s_class].keys())
+
+    @classmethod
+    def all(cls) -> Iterable[TypeVar('Base')]:
+        """ Return all objects
+        """
+        return cls.search()
+
+    @classmethod
+    def get(cls, id: str) -> TypeVar('Base'):
+        """ Return one object by ID
+        """
+        s_class = cls.__name__
+        return DATA[s_class].get(id)
+
+    @classmethod
+    def search(cls, attributes: dict = {}) -> List[TypeVar('Base')]:
+        """ Search all objects with matching attributes
+
+        Indexes only reflect saved values: candidates found through an
+        index are still checked against every attribute
+        """
+        s_class = cls.__name__
+        def _search(obj):
+            if len(attributes) == 0:
+                return True
+            for k, v in attributes.items():
+                if (getattr(obj, k) != v):
+                    return False
+            return True
+
+        candidates = DATA[s_class].values()
+        indexes = INDEXES.get(s_class, {})
+        for k, v in attributes.items():
+            if k not in cls._indexes:
+                continue
+            try:
+                candidates = indexes.get(k, {}).get(v, {}).values()
+            except TypeError:
+                continue
+            break
+        return list(filter(_search, candidates))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+""" Tests of SignedSessionAuth session revocation
+"""
+import unittest
+
+from api.v1.auth.signed_session_auth import SignedSessionAuth
+
+
+class TestDestroyAllSessions(unittest.TestCase):
+    """ destroy_all_sessions, as called when a user is deleted
+    """
+
+    def setUp(self):
+        """ A session auth signing with a fixed key
+        """
+        self.auth = SignedSessionAuth(b"secret")
+
+    def test_token_issued_just_before_is_rejected(self):
+        """ A token issued right before destroy_all_sessions is revoked
+        """
+        for _ in range(1000):
+            token = self.auth.create_session("user")
+            self.assertEqual(self.auth.user_id_for_session_id(token), "user")
+            self.auth.destroy_all_sessions("user")
+            self.assertIsNone(self.auth.user_id_for_session_id(token))
+
+    def test_token_issued_right_after_is_valid(self):
+        """ A login right after destroy_all_sessions gets a valid token
+        """
+        for _ in range(1000):
+            self.auth.destroy_all_sessions("user")
+            token = self.auth.create_session("user")
+            self.assertEqual(self.auth.user_id_for_session_id(token), "user")
+
+    def test_other_users_are_not_revoked(self):
+        """ destroy_all_sessions only revokes the tokens of its user
+        """
+        token = self.auth.create_session("other")
+        self.auth.destroy_all_sessions("user")
+        self.assertEqual(self.auth.user_id_for_session_id(token), "other")
+
+
+if __name__ == "__main__":
+    unittest.main()
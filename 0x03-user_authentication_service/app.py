@@ -11,10 +11,31 @@ from flask import (
     url_for
 )
 
-from auth import Auth
+import os
+
+from auth import Auth, HashingBusyError
 
 app = Flask(__name__)
 auth_service = Auth()  # Renamed from AUTH to auth_service
+# Largest list of users POST /users/batch accepts
+BATCH_MAX_USERS = int(os.getenv("AUTH_BATCH_MAX_USERS", 100))
+
+
+@app.errorhandler(HashingBusyError)
+def hashing_busy(error) -> str:
+    """
+    Shed load when too many password hashes are already pending
+    """
+    return jsonify({"message": "too many requests, retry later"}), 503, \
+        {"Retry-After": "1"}
+
+
+@app.teardown_appcontext
+def remove_db_session(exception=None) -> None:
+    """
+    Release the database session of the request's thread
+    """
+    auth_service.teardown()
 
 
 @app.route("/", methods=["GET"], strict_slashes=False)
@@ -41,6 +62,22 @@ def users() -> str:
     return jsonify({"email": f"{email}", "message": "user created"})
 
 
+@app.route("/users/batch", methods=["POST"], strict_slashes=False)
+def users_batch() -> str:
+    """
+    Register many users from a JSON list of {"email", "password"} objects
+    and return the outcome of each row and the throughput; lists longer
+    than AUTH_BATCH_MAX_USERS are rejected with 413
+    """
+    users = request.get_json(silent=True)
+    if not isinstance(users, list):
+        return jsonify({"message": "expected a JSON list of users"}), 400
+    if len(users) > BATCH_MAX_USERS:
+        return jsonify({"message": f"at most {BATCH_MAX_USERS} users"
+                                   " per batch"}), 413
+    return jsonify(auth_service.register_users(users))
+
+
 @app.route("/sessions", methods=["POST"], strict_slashes=False)
 def login() -> str:
     """
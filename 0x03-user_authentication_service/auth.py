@@ -2,10 +2,17 @@
 """
 Definition of authentication-related functions and the Auth class.
 """
+import asyncio
 import bcrypt
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from uuid import uuid4
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm.exc import NoResultFound
 from typing import (
+    List,
     TypeVar,
     Union
 )
@@ -16,16 +23,109 @@ from user import User
 U = TypeVar(User)
 
 
-def _hash_password(password: str) -> bytes:
+def _hash_password(password: str, rounds: int = None) -> bytes:
     """
     Hashes a password string using bcrypt and returns it as bytes.
     Args:
         password (str): Password in string format.
+        rounds (int): bcrypt cost factor, bcrypt's default if None.
     Returns:
         bytes: The hashed password.
     """
     passwd = password.encode('utf-8')
-    return bcrypt.hashpw(passwd, bcrypt.gensalt())
+    salt = bcrypt.gensalt() if rounds is None else bcrypt.gensalt(rounds)
+    return bcrypt.hashpw(passwd, salt)
+
+
+def _hash_cost(hashed_password: bytes) -> int:
+    """
+    Reads the cost factor of a bcrypt hash.
+    Args:
+        hashed_password (bytes): A hash such as b"$2b$12$...".
+    Returns:
+        int: The cost factor the hash was generated with.
+    """
+    if isinstance(hashed_password, str):
+        hashed_password = hashed_password.encode('utf-8')
+    return int(hashed_password.split(b"$")[2])
+
+
+def calibrate_cost(target_seconds: float = 0.25, min_rounds: int = 4,
+                   max_rounds: int = 16) -> int:
+    """
+    Picks the highest bcrypt cost factor whose hash time on this machine
+    stays within target_seconds. Each extra round doubles the hash time,
+    so calibrating takes about twice the target.
+    Args:
+        target_seconds (float): Acceptable time to hash one password.
+        min_rounds (int): Lowest cost factor returned.
+        max_rounds (int): Highest cost factor returned.
+    Returns:
+        int: The calibrated cost factor.
+    """
+    def measure(rounds: int) -> float:
+        salt = bcrypt.gensalt(rounds)
+        started = time.perf_counter()
+        bcrypt.hashpw(b"calibration password", salt)
+        return time.perf_counter() - started
+
+    rounds = min_rounds
+    elapsed = measure(rounds)
+    while rounds < max_rounds and elapsed * 2 <= target_seconds:
+        rounds += 1
+        elapsed = measure(rounds)
+    if elapsed > target_seconds and rounds > min_rounds:
+        rounds -= 1
+    return rounds
+
+
+def _env_int(name: str, default: int = None) -> int:
+    """
+    Reads an integer environment variable.
+    Args:
+        name (str): Name of the variable.
+        default (int): Value if the variable is unset or not an integer.
+    Returns:
+        int: The value of the variable.
+    """
+    try:
+        return int(os.getenv(name) or default)
+    except (TypeError, ValueError):
+        return default
+
+
+def _configured_cost() -> int:
+    """
+    bcrypt cost factor to hash new passwords with: BCRYPT_ROUNDS if set
+    to a valid cost (4 to 31), else calibrated to BCRYPT_TARGET_MS
+    milliseconds if set, else 12 (bcrypt's default).
+    A calibrated cost is pinned in BCRYPT_ROUNDS, so the pools of this
+    process and the workers it starts afterwards reuse it instead of
+    each measuring their own, possibly different, cost.
+    Returns:
+        int: The cost factor.
+    """
+    rounds = _env_int("BCRYPT_ROUNDS")
+    if rounds is not None and 4 <= rounds <= 31:
+        return rounds
+    target_ms = _env_int("BCRYPT_TARGET_MS")
+    if target_ms is None or target_ms <= 0:
+        return 12
+    rounds = calibrate_cost(target_ms / 1000)
+    os.environ["BCRYPT_ROUNDS"] = str(rounds)
+    return rounds
+
+
+def _check_password(password: str, hashed_password: bytes) -> bool:
+    """
+    Checks a password string against a bcrypt hash.
+    Args:
+        password (str): Password in string format.
+        hashed_password (bytes): The stored hash.
+    Returns:
+        bool: True if the password matches the hash.
+    """
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
 
 
 def _generate_uuid() -> str:
@@ -37,6 +137,117 @@ def _generate_uuid() -> str:
     return str(uuid4())
 
 
+class HashingBusyError(RuntimeError):
+    """
+    Raised when the hashing pool already has max_pending hashes in flight.
+    """
+
+
+class HashingService:
+    """
+    Runs bcrypt on a bounded thread pool instead of the request thread.
+    bcrypt releases the GIL, so the workers hash in parallel, and at most
+    max_pending hashes are queued or running: past that, calls fail fast
+    with HashingBusyError instead of piling up behind a login burst.
+    """
+
+    def __init__(self, max_workers: int = None,
+                 max_pending: int = None, rounds: int = None) -> None:
+        """
+        Initialize the pool, sized by BCRYPT_WORKERS (default: CPU count)
+        and BCRYPT_MAX_PENDING (default: 4 per worker). New hashes use the
+        `rounds` cost factor (default: see _configured_cost).
+        """
+        self.rounds = rounds or _configured_cost()
+        self.max_workers = (max_workers or _env_int("BCRYPT_WORKERS", 0)
+                            or os.cpu_count() or 1)
+        self.max_pending = (max_pending
+                            or _env_int("BCRYPT_MAX_PENDING", 0)
+                            or self.max_workers * 4)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="bcrypt")
+        self._pending = threading.BoundedSemaphore(self.max_pending)
+
+    def submit(self, function, *args) -> Future:
+        """
+        Schedules function(*args) on the pool.
+        Returns:
+            Future: The future result of the call.
+        Raises:
+            HashingBusyError: If max_pending calls are already in flight.
+        """
+        if not self._pending.acquire(blocking=False):
+            raise HashingBusyError(
+                f"{self.max_pending} password hashes already pending")
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    def hash_password(self, password: str) -> bytes:
+        """
+        Hashes a password on the pool and waits for the result.
+        """
+        return self.submit(_hash_password, password, self.rounds).result()
+
+    def hash_passwords(self, passwords: List[str]) -> List[bytes]:
+        """
+        Hashes many passwords in parallel on the pool and waits for them.
+        At most half of the workers hash them at once, so logins keep
+        workers of their own; like any other hash, a batch is shed when
+        the pool has no pending slot left.
+        Args:
+            passwords (List[str]): Passwords in string format.
+        Returns:
+            List[bytes]: The hashes, in the order of the passwords.
+        Raises:
+            HashingBusyError: If max_pending hashes are already in flight.
+        """
+        window = threading.BoundedSemaphore(max(self.max_workers // 2, 1))
+        futures = []
+        for password in passwords:
+            window.acquire()
+            try:
+                future = self.submit(_hash_password, password, self.rounds)
+            except HashingBusyError:
+                window.release()
+                raise
+            future.add_done_callback(lambda _: window.release())
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    def check_password(self, password: str, hashed_password: bytes) -> bool:
+        """
+        Checks a password on the pool and waits for the result.
+        """
+        return self.submit(_check_password, password,
+                           hashed_password).result()
+
+    async def hash_password_async(self, password: str) -> bytes:
+        """
+        Hashes a password on the pool without blocking the event loop.
+        """
+        return await asyncio.wrap_future(
+            self.submit(_hash_password, password, self.rounds))
+
+    async def check_password_async(self, password: str,
+                                   hashed_password: bytes) -> bool:
+        """
+        Checks a password on the pool without blocking the event loop.
+        """
+        return await asyncio.wrap_future(
+            self.submit(_check_password, password, hashed_password))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the workers once the pending hashes are done.
+        """
+        self._executor.shutdown(wait=wait)
+
+
 class Auth:
     """
     Auth class to manage user authentication, registration, and sessions.
@@ -47,6 +258,14 @@ class Auth:
         Initialize the Auth class with a database instance.
         """
         self._db = DB()
+        self._hasher = HashingService()
+
+    def teardown(self) -> None:
+        """
+        Releases the database session of the current thread.
+        Call it at the end of every request.
+        """
+        self._db.remove_session()
 
     def register_user(self, email: str, password: str) -> User:
         """
@@ -62,14 +281,84 @@ class Auth:
         try:
             self._db.find_user_by(email=email)
         except NoResultFound:
-            hashed_password = _hash_password(password)
+            hashed_password = self._hasher.hash_password(password)
             user = self._db.add_user(email, hashed_password)
             return user
         raise ValueError(f"User {email} already exists")
 
+    def register_users(self, users: List[dict]) -> dict:
+        """
+        Registers many users at once.
+        Emails are deduplicated in memory, checked against the database
+        with IN queries, the passwords of new users hashed in parallel,
+        and the new users inserted in a single transaction.
+        Args:
+            users (List[dict]): Users to register, each with an email and
+                a password.
+        Returns:
+            dict: "results" holds, in input order, the email and status of
+                each row: "created", "exists" (already registered),
+                "duplicate" (earlier in the batch), "invalid" (missing
+                email or password) or "conflict" (registered concurrently
+                and the retry failed too); then the "created" count, "elapsed"
+                seconds and "users_per_second".
+        """
+        started = time.perf_counter()
+        results = []
+        first_rows = {}
+        for index, entry in enumerate(users):
+            email = entry.get("email") if isinstance(entry, dict) else None
+            password = entry.get("password") if email else None
+            if not isinstance(email, str) or not isinstance(password, str) \
+                    or not email or not password:
+                status = "invalid"
+            elif email in first_rows:
+                status = "duplicate"
+            else:
+                first_rows[email] = index
+                status = None
+            results.append({"email": email, "status": status})
+
+        new_emails = list(first_rows)
+        for attempt in range(2):
+            existing = self._db.find_existing_emails(new_emails)
+            for email in existing:
+                results[first_rows[email]]["status"] = "exists"
+            new_emails = [email for email in new_emails
+                          if email not in existing]
+            if attempt == 0:
+                hashes = dict(zip(new_emails, self._hasher.hash_passwords(
+                    [users[first_rows[email]]["password"]
+                     for email in new_emails])))
+            try:
+                self._db.add_users([
+                    {"email": email, "hashed_password": hashes[email]}
+                    for email in new_emails])
+                break
+            except IntegrityError:
+                if attempt:
+                    for email in new_emails:
+                        results[first_rows[email]]["status"] = "conflict"
+                    new_emails = []
+                # registered concurrently: check again, then retry once
+        for email in new_emails:
+            results[first_rows[email]]["status"] = "created"
+
+        elapsed = time.perf_counter() - started
+        return {
+            "results": results,
+            "created": len(new_emails),
+            "elapsed": elapsed,
+            "users_per_second": len(users) / elapsed if elapsed else 0.0,
+        }
+
     def valid_login(self, email: str, password: str) -> bool:
         """
         Validates a user's login credentials.
+        A valid password whose stored hash has a lower cost factor than
+        the configured one is rehashed, so raising the cost needs no
+        migration. Hashes are never rehashed to a lower cost, so workers
+        configured with different costs do not rewrite each other's.
         Args:
             email (str): The user's email address.
             password (str): The user's password.
@@ -82,7 +371,15 @@ class Auth:
             return False
 
         user_password = user.hashed_password
-        return bcrypt.checkpw(password.encode("utf-8"), user_password)
+        if not self._hasher.check_password(password, user_password):
+            return False
+        if _hash_cost(user_password) < self._hasher.rounds:
+            try:
+                hashed_password = self._hasher.hash_password(password)
+            except HashingBusyError:
+                return True  # upgrade on a later login
+            self._db.update_user(user.id, hashed_password=hashed_password)
+        return True
 
     def create_session(self, email: str) -> Union[None, str]:
         """
@@ -92,13 +389,11 @@ class Auth:
         Returns:
             Union[None, str]: The session ID if successful, or None if the user is not found.
         """
+        session_id = _generate_uuid()
         try:
-            user = self._db.find_user_by(email=email)
-        except NoResultFound:
+            self._db.update_user_by_email(email, session_id=session_id)
+        except ValueError:
             return None
-
-        session_id = _generate_uuid()
-        self._db.update_user(user.id, session_id=session_id)
         return session_id
 
     def get_user_from_session_id(self, session_id: str) -> Union[None, U]:
@@ -137,13 +432,8 @@ class Auth:
         Raises:
             ValueError: If no user is found with the given email.
         """
-        try:
-            user = self._db.find_user_by(email=email)
-        except NoResultFound:
-            raise ValueError
-
         reset_token = _generate_uuid()
-        self._db.update_user(user.id, reset_token=reset_token)
+        self._db.update_user_by_email(email, reset_token=reset_token)
         return reset_token
 
     def update_password(self, reset_token: str, password: str) -> None:
@@ -160,5 +450,5 @@ class Auth:
         except NoResultFound:
             raise ValueError
 
-        hashed_password = _hash_password(password)
+        hashed_password = self._hasher.hash_password(password)
         self._db.update_user(user.id, hashed_password=hashed_password, reset_token=None)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark of DB.find_user_by lookups.
+Fills a scratch database with N users (1,000,000 by default), then
+prints lookups/sec by email, session_id and reset_token. That these
+lookups use an index is checked by tests/test_indexes.py.
+Usage: ./bench_lookups.py [rows] [lookups]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from db import DB
+from user import User
+
+
+def fill(db: DB, rows: int, chunk: int = 50000) -> None:
+    """
+    Inserts `rows` users in chunks, bypassing the ORM.
+    Args:
+        db (DB): Database to fill.
+        rows (int): Number of users.
+        chunk (int): Users per INSERT batch.
+    """
+    for start in range(0, rows, chunk):
+        with db._engine.begin() as connection:
+            connection.execute(User.__table__.insert(), [
+                {
+                    "email": "user{}@example.com".format(i),
+                    "hashed_password": "x",
+                    "session_id": "session-{}".format(i),
+                    "reset_token": "token-{}".format(i),
+                }
+                for i in range(start, min(start + chunk, rows))
+            ])
+
+
+def main() -> None:
+    """
+    Prints lookups/sec per column.
+    """
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    os.chdir(tempfile.mkdtemp())
+    db = DB()
+
+    started = time.perf_counter()
+    fill(db, rows)
+    print("inserted {:,} users in {:.1f}s".format(
+        rows, time.perf_counter() - started))
+
+    prefixes = {"email": "user{}@example.com", "session_id": "session-{}",
+                "reset_token": "token-{}"}
+    for column, pattern in prefixes.items():
+        values = [pattern.format(random.randrange(rows))
+                  for _ in range(lookups)]
+        started = time.perf_counter()
+        for value in values:
+            db.find_user_by(**{column: value})
+        elapsed = time.perf_counter() - started
+        print("{:<12} {:>10,.0f} lookups/sec".format(
+            column, lookups / elapsed))
+        db._session.expunge_all()
+
+
+if __name__ == "__main__":
+    main()
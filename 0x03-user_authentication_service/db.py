@@ -2,41 +2,185 @@
 """
 DB module to manage database interactions for user authentication.
 """
-from sqlalchemy import create_engine
+import os
+from typing import List, Set
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 from sqlalchemy.orm.session import Session
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.exc import IntegrityError, InvalidRequestError
 
 from user import Base, User
 
+# Versioned schema changes, applied in order and recorded in the
+# schema_migrations table. Statements must be idempotent: a migration
+# interrupted, or run concurrently by another process, is run again.
+SCHEMA_MIGRATIONS = (
+    (1, (
+        "CREATE TABLE IF NOT EXISTS users ("
+        " id INTEGER NOT NULL,"
+        " email VARCHAR(250) NOT NULL,"
+        " hashed_password VARCHAR(250) NOT NULL,"
+        " session_id VARCHAR(250),"
+        " reset_token VARCHAR(250),"
+        " PRIMARY KEY (id))",
+    )),
+    (2, (
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)",
+        "CREATE INDEX IF NOT EXISTS ix_users_session_id"
+        " ON users (session_id)",
+        "CREATE INDEX IF NOT EXISTS ix_users_reset_token"
+        " ON users (reset_token)",
+    )),
+)
+
+
+# Column attributes of User, for validating attribute names
+USER_COLUMNS = frozenset(attr.key for attr in inspect(User).column_attrs)
+
+
+def _env_int(name: str, default: int) -> int:
+    """
+    Reads an integer environment variable.
+    Args:
+        name (str): Name of the variable.
+        default (int): Value if the variable is unset or invalid.
+    Returns:
+        int: The value of the variable.
+    """
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _create_engine(url: str) -> Engine:
+    """
+    Creates the engine of a database URL with a connection pool sized by
+    AUTH_DB_POOL_SIZE, AUTH_DB_MAX_OVERFLOW and AUTH_DB_POOL_TIMEOUT.
+    SQLite files are opened in WAL mode, so readers in other threads do
+    not wait for a writer; in-memory SQLite shares one connection.
+    Args:
+        url (str): Database URL.
+    Returns:
+        Engine: The engine.
+    """
+    if not url.startswith("sqlite"):
+        return create_engine(
+            url, echo=False,
+            pool_size=_env_int("AUTH_DB_POOL_SIZE", 5),
+            max_overflow=_env_int("AUTH_DB_MAX_OVERFLOW", 10),
+            pool_timeout=_env_int("AUTH_DB_POOL_TIMEOUT", 30))
+    connect_args = {"check_same_thread": False,
+                    "timeout": _env_int("AUTH_DB_BUSY_TIMEOUT", 5)}
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        return create_engine(url, echo=False, connect_args=connect_args,
+                             poolclass=StaticPool)
+    engine = create_engine(
+        url, echo=False, connect_args=connect_args, poolclass=QueuePool,
+        pool_size=_env_int("AUTH_DB_POOL_SIZE", 5),
+        max_overflow=_env_int("AUTH_DB_MAX_OVERFLOW", 10),
+        pool_timeout=_env_int("AUTH_DB_POOL_TIMEOUT", 30))
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        """
+        Switches every new SQLite connection to WAL mode.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    return engine
+
 
 class DB:
     """
     DB class for handling user-related database operations.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, reset: bool = None, url: str = None) -> None:
         """
         Initialize a new DB instance.
-        Creates the SQLite database and initializes its schema.
+        Opens the database, keeping its data, and applies pending
+        schema migrations.
+        Args:
+            reset (bool): Drop every table first, for tests; defaults to
+                whether the AUTH_DB_RESET environment variable is "1".
+            url (str): Database URL; defaults to AUTH_DB_URL, else the
+                SQLite file a.db.
+        """
+        if reset is None:
+            reset = os.getenv("AUTH_DB_RESET") == "1"
+        if url is None:
+            url = os.getenv("AUTH_DB_URL", "sqlite:///a.db")
+        self._engine = _create_engine(url)
+        if reset:
+            Base.metadata.drop_all(self._engine)  # Reset the database schema
+            with self._engine.begin() as connection:
+                connection.execute(
+                    text("DROP TABLE IF EXISTS schema_migrations"))
+        self.migrate()
+        # One session per thread, released by remove_session()
+        self._sessions = scoped_session(sessionmaker(bind=self._engine))
+
+    def schema_version(self) -> int:
+        """
+        Returns the version of the last applied schema migration.
+        Returns:
+            int: The schema version, 0 for an empty database.
+        """
+        with self._engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations"
+                " (version INTEGER PRIMARY KEY)"))
+            return connection.execute(text(
+                "SELECT MAX(version) FROM schema_migrations")).scalar() or 0
+
+    def migrate(self) -> int:
+        """
+        Applies the schema migrations newer than the database, each in its
+        own transaction; an up-to-date database costs a single query.
+        Returns:
+            int: The number of migrations applied.
         """
-        self._engine = create_engine("sqlite:///a.db", echo=False)
-        Base.metadata.drop_all(self._engine)  # Reset the database schema
-        Base.metadata.create_all(self._engine)  # Create tables
-        self.__session = None
+        current = self.schema_version()
+        applied = 0
+        for version, statements in SCHEMA_MIGRATIONS:
+            if version <= current:
+                continue
+            try:
+                with self._engine.begin() as connection:
+                    for statement in statements:
+                        connection.execute(text(statement))
+                    connection.execute(text(
+                        "INSERT INTO schema_migrations (version)"
+                        " VALUES (:version)"), {"version": version})
+            except IntegrityError:
+                if self.schema_version() < version:
+                    raise  # the migration itself failed
+                continue  # applied meanwhile by another process
+            applied += 1
+        return applied
 
     @property
     def _session(self) -> Session:
         """
-        Memoized session object.
-        Creates a new session if one does not already exist.
+        Session of the current thread.
+        Creates it if the thread does not have one yet.
         """
-        if self.__session is None:
-            DBSession = sessionmaker(bind=self._engine)
-            self.__session = DBSession()
-        return self.__session
+        return self._sessions()
+
+    def remove_session(self) -> None:
+        """
+        Closes the session of the current thread, if any, returning its
+        connection to the pool. Call it when a request ends.
+        """
+        self._sessions.remove()
 
     def add_user(self, email: str, hashed_password: str) -> User:
         """
@@ -52,6 +196,44 @@ class DB:
         self._session.commit()
         return user
 
+    def add_users(self, users: List[dict]) -> None:
+        """
+        Inserts many users with one executemany, in a single transaction.
+        Args:
+            users (List[dict]): Column values of each user, with at least
+                email and hashed_password.
+        Raises:
+            IntegrityError: If an email is already registered; nothing is
+                inserted then.
+        """
+        if not users:
+            return
+        try:
+            self._session.execute(User.__table__.insert(), users)
+            self._session.commit()
+        except Exception:
+            self._session.rollback()
+            raise
+
+    def find_existing_emails(self, emails: List[str],
+                             chunk_size: int = 500) -> Set[str]:
+        """
+        Returns which of the given emails are registered, with one
+        IN query per chunk_size emails.
+        Args:
+            emails (List[str]): Email addresses to look up.
+            chunk_size (int): Emails per query, under SQLite's limit on
+                bound parameters.
+        Returns:
+            Set[str]: The registered emails.
+        """
+        existing = set()
+        for start in range(0, len(emails), chunk_size):
+            chunk = emails[start:start + chunk_size]
+            existing.update(email for email, in self._session.query(
+                User.email).filter(User.email.in_(chunk)))
+        return existing
+
     def find_user_by(self, **kwargs) -> User:
         """
         Finds a user by matching attributes provided as keyword arguments.
@@ -66,7 +248,7 @@ class DB:
         try:
             query = self._session.query(User)
             for key, value in kwargs.items():
-                if not hasattr(User, key):
+                if key not in USER_COLUMNS:
                     raise InvalidRequestError(f"Invalid attribute: {key}")
                 query = query.filter(getattr(User, key) == value)
             user = query.one()
@@ -74,6 +256,32 @@ class DB:
         except NoResultFound:
             raise NoResultFound("No user found with the provided attributes.")
 
+    def _update(self, criterion, values: dict) -> int:
+        """
+        Updates the users matching a criterion with one UPDATE statement,
+        without loading them.
+        Args:
+            criterion: SQLAlchemy filter selecting the users.
+            values (dict): Attributes to set.
+        Returns:
+            int: The number of matched users.
+        Raises:
+            ValueError: If an invalid attribute is provided.
+        """
+        for key in values:
+            if key not in USER_COLUMNS:
+                raise ValueError(f"Invalid attribute: {key}")
+        query = self._session.query(User).filter(criterion)
+        if not values:
+            return query.count()
+        try:
+            count = query.update(values, synchronize_session=False)
+            self._session.commit()
+        except Exception:
+            self._session.rollback()
+            raise
+        return count
+
     def update_user(self, user_id: int, **kwargs) -> None:
         """
         Updates a user's attributes in the database.
@@ -81,15 +289,21 @@ class DB:
             user_id (int): ID of the user to update.
             **kwargs: Key-value pairs of attributes to update.
         Raises:
-            ValueError: If the user is not found or an invalid attribute is provided.
+            ValueError: If the user is not found or an invalid attribute
+                is provided.
         """
-        try:
-            user = self.find_user_by(id=user_id)
-        except NoResultFound:
+        if self._update(User.id == user_id, kwargs) == 0:
             raise ValueError(f"User with ID {user_id} does not exist.")
 
-        for key, value in kwargs.items():
-            if not hasattr(user, key):
-                raise ValueError(f"Invalid attribute: {key}")
-            setattr(user, key, value)
-        self._session.commit()
+    def update_user_by_email(self, email: str, **kwargs) -> None:
+        """
+        Updates the attributes of the user with an email address.
+        Args:
+            email (str): Email address of the user to update.
+            **kwargs: Key-value pairs of attributes to update.
+        Raises:
+            ValueError: If the user is not found or an invalid attribute
+                is provided.
+        """
+        if self._update(User.email == email, kwargs) == 0:
+            raise ValueError(f"User {email} does not exist.")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Query-plan check of DB.find_user_by lookups: SQLite must answer lookups
+by email, session_id and reset_token from their index.
+"""
+import unittest
+from sqlalchemy import text
+
+from db import DB
+from user import User
+
+INDEXES = {
+    "email": "ix_users_email",
+    "session_id": "ix_users_session_id",
+    "reset_token": "ix_users_reset_token",
+}
+
+
+def query_plan(db: DB, column: str, value: str) -> str:
+    """
+    Returns the SQLite query plan of the query find_user_by builds for
+    `column`.
+    Args:
+        db (DB): Database to query.
+        column (str): Looked up column.
+        value (str): Looked up value.
+    Returns:
+        str: The query plan.
+    """
+    query = db._session.query(User).filter(getattr(User, column) == value)
+    sql = str(query.statement.compile(
+        db._engine, compile_kwargs={"literal_binds": True}))
+    with db._engine.connect() as connection:
+        return " ".join(row[-1] for row in connection.execute(
+            text("EXPLAIN QUERY PLAN " + sql)))
+
+
+class TestLookupIndexes(unittest.TestCase):
+    """
+    find_user_by searches an index for each looked up column.
+    """
+
+    def setUp(self):
+        """
+        An in-memory database with a few users.
+        """
+        self.db = DB(url="sqlite://")
+        for i in range(20):
+            user = self.db.add_user("user{}@example.com".format(i), "x")
+            self.db.update_user(user.id, session_id="session-{}".format(i),
+                                reset_token="token-{}".format(i))
+
+    def test_lookups_use_index(self):
+        """
+        Each lookup searches its column's index instead of scanning.
+        """
+        for column, index in INDEXES.items():
+            with self.subTest(column=column):
+                plan = query_plan(self.db, column, "x")
+                self.assertIn("INDEX {}".format(index), plan)
+                self.assertNotIn("SCAN", plan)
+
+    def test_lookups_find_user(self):
+        """
+        The indexed lookups return the matching user.
+        """
+        user = self.db.find_user_by(session_id="session-7")
+        self.assertEqual(user.email, "user7@example.com")
+        user = self.db.find_user_by(reset_token="token-3")
+        self.assertEqual(user.email, "user3@example.com")
+
+
+if __name__ == "__main__":
+    unittest.main()